@@ -1,16 +1,17 @@
+import hmac
 import uuid
+from typing import Optional
 
 from app.config import Config
-from app.services.db_service import DatabaseService
+from app.services.admission import AdmissionRejected
+from app.services.health_monitor import HealthMonitor
+from app.services.log_writer import PredictionLogWriter
 from app.services.model_service import ModelService
-
-config = Config()
-
-model_service = ModelService(config)
-model_service.initialize()
-
-db_service = DatabaseService(config)
-db_service.initialize()
+from app.services.prediction_history import PredictionHistory
+from app.services.registry import ServiceRegistry
+from app.services.stats_service import StatsService
+from app.utils.profiler import StackSampler
+from fastapi import Depends, Header, HTTPException, Request, status
 
 
 def get_request_id() -> str:
@@ -18,16 +19,75 @@ def get_request_id() -> str:
     return str(uuid.uuid4())
 
 
-def get_model_service() -> ModelService:
+def get_services(request: Request) -> ServiceRegistry:
+    # Return the application-scoped registry initialized in lifespan
+    return request.app.state.services
+
+
+def get_model_service(services: ServiceRegistry = Depends(get_services)) -> ModelService:
     # Return the shared instance of ModelService
-    return model_service
+    return services.model_service
+
+
+def get_log_writer(services: ServiceRegistry = Depends(get_services)) -> PredictionLogWriter:
+    # Return the shared buffered prediction-log writer
+    return services.log_writer
+
+
+def get_stats_service(services: ServiceRegistry = Depends(get_services)) -> StatsService:
+    # Return the in-memory streaming statistics
+    return services.stats_service
 
 
-def get_db_service() -> DatabaseService:
-    # Return the shared instance of DatabaseService
-    return db_service
+def get_profiler(services: ServiceRegistry = Depends(get_services)) -> StackSampler:
+    # Return the runtime-switchable sampling profiler
+    return services.profiler
 
 
-def get_config() -> Config:
+def get_health_monitor(services: ServiceRegistry = Depends(get_services)) -> HealthMonitor:
+    # Return the background health monitor with the cached component status
+    return services.health_monitor
+
+
+def get_prediction_history(
+    services: ServiceRegistry = Depends(get_services),
+) -> PredictionHistory:
+    # Return the read-back of logged predictions
+    return services.prediction_history
+
+
+async def admit(request: Request, services: ServiceRegistry = Depends(get_services)):
+    # Admission control in front of the prediction endpoints, the slot is held until the
+    # handler returns; rejected requests get a fast 429/503 with Retry-After
+    admission = services.admission
+    client = request.headers.get(admission.client_header)
+    if not client:
+        client = f"ip:{request.client.host}" if request.client else "unknown"
+    try:
+        granted_at = await admission.acquire(client)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        admission.release(granted_at)
+
+
+def get_config(services: ServiceRegistry = Depends(get_services)) -> Config:
     # Return the Config instance
-    return config
+    return services.config
+
+
+def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    config: Config = Depends(get_config),
+):
+    # Admin endpoints are disabled unless ADMIN_TOKEN is configured
+    if config.admin_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, config.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
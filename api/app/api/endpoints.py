@@ -1,13 +1,57 @@
+import asyncio
+import json
 import logging
+import time
 from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, List, Optional
 
-from app.api.dependencies import get_config, get_db_service, get_model_service, get_request_id
+import numpy as np
+from app.api.dependencies import (
+    admit,
+    get_config,
+    get_health_monitor,
+    get_log_writer,
+    get_model_service,
+    get_prediction_history,
+    get_profiler,
+    get_request_id,
+    get_stats_service,
+    require_admin,
+)
 from app.config import Config
-from app.models.schemas import HealthResponse, InputData, PredictionResponse
-from app.services.db_service import DatabaseService
+from app.models.schemas import (
+    BatchInputData,
+    BatchPredictionResponse,
+    DriftResponse,
+    HealthResponse,
+    InputData,
+    ModelVersionsResponse,
+    PredictionHistoryPage,
+    PredictionRecord,
+    PredictionResponse,
+    ProbeResponse,
+    ProfilerStatus,
+    StatsResponse,
+)
+from app.services.health_monitor import HealthMonitor
+from app.services.log_writer import PredictionLogWriter
 from app.services.model_service import ModelService
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from app.services.prediction_history import PredictionHistory
+from app.services.stats_service import StatsService
+from app.utils.binary_rows import (
+    BINARY_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPES,
+    decode_msgpack_rows,
+    decode_rows,
+    encode_msgpack,
+    encode_predictions,
+)
+from app.utils.features import rows_to_matrix
+from app.utils.profiler import StackSampler
+from app.utils.tracing import bind_request, mark_handler_done, record_since_start, stage
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 logger = logging.getLogger("diabetes_ml")
 
@@ -23,94 +67,648 @@ Run prediction based on 10 input features.
 Returns a float value representing diabetes disease progression.
 
 All prediction data is logged to a PostgreSQL database
-along with a timestamp, unique request ID, and model response time.
+along with a timestamp, unique request ID, model version, and model response time.
 """,
     tags=["Model"],
+    dependencies=[Depends(admit)],
 )
 async def predict(
     data: InputData,
     request_id: str = Depends(get_request_id),
     model_service: ModelService = Depends(get_model_service),
-    db_service: DatabaseService = Depends(get_db_service),
+    log_writer: PredictionLogWriter = Depends(get_log_writer),
+    stats_service: StatsService = Depends(get_stats_service),
 ):
     # Make a prediction based on user input
-    start_time = datetime.now(timezone.utc)
+    record_since_start("parse")
+    bind_request(request_id=request_id)
+    start_time = time.perf_counter()
     features = [getattr(data, f"x{i}") for i in range(1, 11)]
 
     try:
         feature_tuple = tuple(features)
-        prediction = model_service.predict(feature_tuple)
-        processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
+        prediction, model_version = await model_service.predict_async(feature_tuple)
+        bind_request(model_version=model_version)
+        processing_time = time.perf_counter() - start_time
+        stats_service.record(processing_time, "ok", prediction)
 
-        db_service.log_prediction(
-            request_id=request_id,
-            features=features,
-            prediction=prediction,
-            status="ok",
-            processing_time=processing_time,
-        )
+        with stage("db_log"):
+            await log_writer.log_prediction(
+                request_id=request_id,
+                features=features,
+                prediction=prediction,
+                status="ok",
+                processing_time=processing_time,
+                model_version=model_version,
+            )
 
+        mark_handler_done()
         return {
             "prediction": prediction,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "request_id": request_id,
+            "model_version": model_version,
         }
 
     except Exception as e:
-        processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
-        logger.error(f"Prediction error: {str(e)}")
+        processing_time = time.perf_counter() - start_time
+        logger.error("Prediction error: %s", e)
+        stats_service.record(processing_time, "error")
 
-        db_service.log_prediction(
+        await log_writer.log_prediction(
             request_id=request_id,
             features=features,
             prediction=-1,
-            status=f"error: {str(e)}",
+            status="error",
             processing_time=processing_time,
+            model_version=model_service.model_version,
+            error=str(e),
         )
 
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@router.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    summary="Run diabetes prediction for many rows",
+    description="""
+Run prediction for a batch of rows, each with the same 10 input features as `/predict`.
+All valid rows are scaled and scored together in a single forward pass.
+
+Rows that fail validation are reported individually with `status="error"`
+and do not fail the rest of the batch. Every row gets its own request ID
+and all rows are queued for the buffered bulk write to the database.
+""",
+    tags=["Model"],
+    dependencies=[Depends(admit)],
+)
+async def predict_batch(
+    data: BatchInputData,
+    model_service: ModelService = Depends(get_model_service),
+    log_writer: PredictionLogWriter = Depends(get_log_writer),
+    stats_service: StatsService = Depends(get_stats_service),
+    config: Config = Depends(get_config),
+):
+    # Make predictions for a batch of rows in one vectorized pass
+    record_since_start("parse")
+    if len(data.rows) > config.batch_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {config.batch_max_rows} rows",
+        )
+
+    start_time = time.perf_counter()
+    with stage("validate"):
+        matrix, errors = rows_to_matrix(data.rows)
+    request_ids = [get_request_id() for _ in data.rows]
+    valid = np.array([error is None for error in errors])
+    predictions = np.full(len(data.rows), np.nan)
+    model_version = model_service.model_version
+
+    if valid.any():
+        try:
+            with stage("inference"):
+                predictions[valid], model_version = await model_service.predict_batch_async(
+                    matrix[valid]
+                )
+        except Exception as e:
+            processing_time = time.perf_counter() - start_time
+            logger.error("Batch prediction error: %s", e)
+            stats_service.record_many(processing_time, ["error"] * len(request_ids), [])
+            await log_writer.log_predictions(
+                [
+                    {
+                        "request_id": request_id,
+                        "features": row.tolist(),
+                        "prediction": -1,
+                        "status": "error",
+                        "error": str(e),
+                        "processing_time": processing_time,
+                        "model_version": model_version,
+                    }
+                    for request_id, row in zip(request_ids, matrix)
+                ],
+            )
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    bind_request(model_version=model_version)
+    processing_time = time.perf_counter() - start_time
+    items = []
+    records = []
+    for i, request_id in enumerate(request_ids):
+        ok = errors[i] is None
+        items.append(
+            {
+                "request_id": request_id,
+                "prediction": float(predictions[i]) if ok else None,
+                "status": "ok" if ok else "error",
+                "error": errors[i],
+            }
+        )
+        records.append(
+            {
+                "request_id": request_id,
+                "features": matrix[i].tolist(),
+                "prediction": float(predictions[i]) if ok else -1,
+                "status": "ok" if ok else "error",
+                "error": errors[i],
+                "processing_time": processing_time,
+                "model_version": model_version,
+            }
+        )
+
+    stats_service.record_many(
+        processing_time, [record["status"] for record in records], predictions[valid]
+    )
+    with stage("db_log"):
+        await log_writer.log_predictions(records)
+
+    succeeded = int(valid.sum())
+    mark_handler_done()
+    return {
+        "predictions": items,
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "model_version": model_version,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@router.post(
+    "/predict/binary",
+    summary="Run diabetes prediction for packed rows",
+    description="""
+Compact variant of `/predict/batch` for high-frequency internal callers, without JSON or
+per-field validation.
+
+* `application/octet-stream`: an 8-byte header (`<I` row count, `<B` value width 4 or 8,
+  3 pad bytes) followed by the rows as little-endian float32/float64 features x1..x10.
+  The response uses the same header followed by one prediction per row.
+* `application/msgpack`: an array of rows (or `{"rows": [...]}`); the response is a
+  msgpack map with `predictions`, `request_ids`, `succeeded`, `failed` and `model_version`.
+
+The response format follows the `Accept` header and defaults to the request format.
+Rows with non-finite features get a NaN (binary) or null (msgpack) prediction.
+Every row is logged to the database like `/predict/batch`, under the request ID
+`<X-Batch-Id>-<row index>`, which `GET /predictions/{request_id}` looks up.
+""",
+    tags=["Model"],
+    dependencies=[Depends(admit)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                BINARY_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                MSGPACK_CONTENT_TYPES[0]: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def predict_binary(
+    request: Request,
+    model_service: ModelService = Depends(get_model_service),
+    log_writer: PredictionLogWriter = Depends(get_log_writer),
+    stats_service: StatsService = Depends(get_stats_service),
+    config: Config = Depends(get_config),
+):
+    # Make predictions for packed rows, validated as one NumPy matrix
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (BINARY_CONTENT_TYPE, *MSGPACK_CONTENT_TYPES):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Use {BINARY_CONTENT_TYPE} or {MSGPACK_CONTENT_TYPES[0]}",
+        )
+    accept = request.headers.get("accept", "")
+    if BINARY_CONTENT_TYPE in accept:
+        response_type = BINARY_CONTENT_TYPE
+    elif any(media_type in accept for media_type in MSGPACK_CONTENT_TYPES):
+        response_type = MSGPACK_CONTENT_TYPES[0]
+    else:
+        response_type = content_type
+
+    body = await request.body()
+    try:
+        if content_type == BINARY_CONTENT_TYPE:
+            matrix, dtype = decode_rows(body)
+        else:
+            matrix, dtype = decode_msgpack_rows(body), np.dtype("<f8")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    record_since_start("parse")
+    if len(matrix) > config.batch_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {config.batch_max_rows} rows",
+        )
+
+    start_time = time.perf_counter()
+    with stage("validate"):
+        valid = np.isfinite(matrix).all(axis=1)
+    # One ID for the whole batch, so the octet-stream response can carry the row IDs in a header
+    batch_id = get_request_id()
+    request_ids = [f"{batch_id}-{i}" for i in range(len(matrix))]
+    predictions = np.full(len(matrix), np.nan)
+    model_version = model_service.model_version
+    # Features are logged as float64 whatever the wire width
+    features = matrix.astype(np.float64).tolist()
+
+    if valid.any():
+        try:
+            with stage("inference"):
+                predictions[valid], model_version = await model_service.predict_batch_async(
+                    matrix[valid].astype(np.float64)
+                )
+        except Exception as e:
+            processing_time = time.perf_counter() - start_time
+            logger.error("Binary prediction error: %s", e)
+            stats_service.record_many(processing_time, ["error"] * len(request_ids), [])
+            await log_writer.log_predictions(
+                [
+                    {
+                        "request_id": request_id,
+                        "features": row,
+                        "prediction": -1,
+                        "status": "error",
+                        "error": str(e),
+                        "processing_time": processing_time,
+                        "model_version": model_version,
+                    }
+                    for request_id, row in zip(request_ids, features)
+                ],
+            )
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    bind_request(model_version=model_version)
+    processing_time = time.perf_counter() - start_time
+    statuses = ["ok" if ok else "error" for ok in valid.tolist()]
+    records = [
+        {
+            "request_id": request_id,
+            "features": row,
+            "prediction": prediction if row_status == "ok" else -1,
+            "status": row_status,
+            "error": None if row_status == "ok" else "Input features cannot be NaN or infinite.",
+            "processing_time": processing_time,
+            "model_version": model_version,
+        }
+        for request_id, row, prediction, row_status in zip(
+            request_ids, features, predictions.tolist(), statuses
+        )
+    ]
+
+    stats_service.record_many(processing_time, statuses, predictions[valid])
+    with stage("db_log"):
+        await log_writer.log_predictions(records)
+
+    succeeded = int(valid.sum())
+    headers = {
+        "X-Batch-Id": batch_id,
+        "X-Model-Version": model_version or "",
+        "X-Rows-Succeeded": str(succeeded),
+        "X-Rows-Failed": str(len(matrix) - succeeded),
+    }
+    mark_handler_done()
+    if response_type == BINARY_CONTENT_TYPE:
+        content = encode_predictions(predictions, dtype)
+    else:
+        content = encode_msgpack(
+            {
+                "predictions": [
+                    prediction if ok else None
+                    for prediction, ok in zip(predictions.tolist(), valid.tolist())
+                ],
+                "request_ids": request_ids,
+                "succeeded": succeeded,
+                "failed": len(matrix) - succeeded,
+                "model_version": model_version,
+            }
+        )
+    return Response(content=content, media_type=response_type, headers=headers)
+
+
+@router.get(
+    "/predictions/{request_id}",
+    response_model=PredictionRecord,
+    summary="Look up a logged prediction",
+    description="""
+Returns the logged prediction of a request ID from `/predict`, `/predict/batch` or
+`/predict/binary`. Predictions made by this instance in the last `RECENT_PREDICTIONS_TTL`
+seconds are answered from memory, even before they are written to the database; older ones
+are read through the `request_id` index. Returns 404 for unknown request IDs.
+""",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def get_prediction(
+    request_id: str,
+    prediction_history: PredictionHistory = Depends(get_prediction_history),
+):
+    item = await prediction_history.get(request_id)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"No prediction for {request_id}"
+        )
+    return item
+
+
+@router.get(
+    "/predictions",
+    response_model=PredictionHistoryPage,
+    summary="Logged predictions of a time range",
+    description="""
+Pages through the predictions logged with `start <= timestamp < end` (`end` defaults to now),
+oldest first or with `order=desc` newest first, optionally only rows with the given `status`.
+
+Pages are keyset-paginated over `(timestamp, id)`: pass `next_cursor` of a page as `cursor`
+to get the next one. Every page costs the same however deep it is and no row is repeated.
+Rows are timestamped when queued and written up to a flush interval later, so while paging
+near now a row can land behind the cursor and be missed; use an `end` a few minutes in the
+past for a complete read. `limit` is at most `PREDICTION_HISTORY_PAGE_SIZE`.
+
+With `Accept: application/x-ndjson` the whole range (from `cursor`, if given) is streamed
+as one JSON object per line, read from the database page by page.
+""",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def get_prediction_history_page(
+    request: Request,
+    start: datetime,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    row_status: Optional[str] = Query(None, alias="status"),
+    prediction_history: PredictionHistory = Depends(get_prediction_history),
+):
+    # Naive timestamps are taken as UTC, like the logged ones
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    end = end or datetime.now(timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end"
+        )
+    if limit > prediction_history.page_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"limit exceeds the maximum of {prediction_history.page_size} rows",
+        )
+    descending = order == "desc"
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        pages = prediction_history.stream(start, end, cursor, descending, row_status)
+        try:
+            # Read the first page here, so a bad cursor or a database error is still a clean
+            # error response instead of a broken stream
+            first_page = await anext(pages)
+        except StopAsyncIteration:
+            first_page = []
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        async def lines():
+            if first_page:
+                yield "".join(json.dumps(item) + "\n" for item in first_page)
+            async for page in pages:
+                yield "".join(json.dumps(item) + "\n" for item in page)
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    try:
+        return await prediction_history.page(start, end, limit, cursor, descending, row_status)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Check API health status",
     description="""
-Checks the health of key system components:
+Reports the health of key system components:
 - model is loaded
 - scaler is loaded
-- database is available and responsive
+- database is available and responsive, with connection pool statistics
 
-Returns current system status and API version.
+The status comes from a background monitor that refreshes it every
+`HEALTH_CHECK_INTERVAL` seconds, so calling this endpoint never touches the database.
+Returns 503 when a component is down or the status has not been refreshed recently.
 """,
     tags=["Monitoring"],
 )
-async def health_check(
+async def health_check(health_monitor: HealthMonitor = Depends(get_health_monitor)):
+    # Health check endpoint for monitoring the app status, served from the cached result
+    health_response = health_monitor.snapshot()
+    if health_response["status"] != "ok":
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=health_response
+        )
+    return health_response
+
+
+@router.get(
+    "/health/live",
+    response_model=ProbeResponse,
+    summary="Liveness probe",
+    description="Answers as long as the event loop is serving requests. Checks no dependencies.",
+    tags=["Monitoring"],
+)
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/health/ready",
+    response_model=ProbeResponse,
+    summary="Readiness probe",
+    description="""
+Returns 200 when the model is loaded and the database answered the last background check,
+503 otherwise. Served from the cached status like `/health`.
+""",
+    tags=["Monitoring"],
+)
+async def readiness(health_monitor: HealthMonitor = Depends(get_health_monitor)):
+    snapshot = health_monitor.snapshot()
+    probe = {"status": snapshot["status"], "reasons": snapshot["reasons"]}
+    if snapshot["status"] != "ok":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=probe)
+    return probe
+
+
+@router.get(
+    "/stats",
+    response_model=StatsResponse,
+    summary="Streaming prediction statistics",
+    description="""
+Latency and prediction percentiles, prediction counts by status, and throughput over
+sliding windows, aggregated in memory by this instance since it started.
+Percentiles come from quantile sketches and are accurate to within 1% (`STATS_SKETCH_ACCURACY`).
+""",
+    tags=["Monitoring"],
+)
+async def get_stats(stats_service: StatsService = Depends(get_stats_service)):
+    return stats_service.summary()
+
+
+@router.get(
+    "/stats/raw",
+    summary="Mergeable statistics state",
+    description="""
+Returns the raw sketch and counter state of this instance. States collected from several
+instances can be combined with `POST /stats/merge` to get cluster-wide statistics.
+""",
+    tags=["Monitoring"],
+)
+async def get_raw_stats(stats_service: StatsService = Depends(get_stats_service)):
+    return stats_service.to_dict()
+
+
+@router.post(
+    "/stats/merge",
+    response_model=StatsResponse,
+    summary="Combine statistics from several instances",
+    description="""
+Merges raw states returned by `GET /stats/raw` and summarizes the result.
+Requires `X-Admin-Token`, malformed states are rejected with 422.
+""",
+    tags=["Monitoring"],
+    dependencies=[Depends(require_admin)],
+)
+async def merge_stats(states: List[Dict[str, Any]], config: Config = Depends(get_config)):
+    combined = StatsService(config)
+    try:
+        for state in states:
+            combined.merge(state)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid stats state: {str(e)}")
+    return combined.summary()
+
+
+@router.get(
+    "/stats/drift",
+    response_model=DriftResponse,
+    summary="Feature drift against training statistics",
+    description="""
+Compares live input features with the training mean and variance stored in the scaler.
+Scores are empty until `DRIFT_MIN_SAMPLES` rows were seen and are also exported
+as Prometheus gauges.
+""",
+    tags=["Monitoring"],
+)
+async def get_drift(model_service: ModelService = Depends(get_model_service)):
+    if model_service.drift is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled")
+    return model_service.drift.summary()
+
+
+@router.get(
+    "/admin/models",
+    response_model=ModelVersionsResponse,
+    summary="List loaded model versions",
+    description="Returns the active model version and the previous versions kept for rollback.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def list_models(model_service: ModelService = Depends(get_model_service)):
+    return model_service.versions()
+
+
+@router.post(
+    "/admin/models/reload",
+    response_model=ModelVersionsResponse,
+    summary="Load the latest model version",
+    description="""
+Checks the model source for new artifacts. A new version is loaded and warmed in the
+background, then swapped in atomically. Requests already in flight finish on the old version.
+""",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def reload_model(model_service: ModelService = Depends(get_model_service)):
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, partial(model_service.reload, force=True))
+    except Exception as e:
+        logger.error("Model reload failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+    return model_service.versions()
+
+
+@router.post(
+    "/admin/models/rollback",
+    response_model=ModelVersionsResponse,
+    summary="Roll back to a previous model version",
+    description="Swaps a previously active version back in, the most recent one by default.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def rollback_model(
+    version: Optional[str] = None,
     model_service: ModelService = Depends(get_model_service),
-    db_service: DatabaseService = Depends(get_db_service),
-    config: Config = Depends(get_config),
 ):
-    # Health check endpoint for monitoring the app status
-    model_loaded = model_service.model is not None
-    scaler_loaded = model_service.scaler is not None
-
-    db_status = db_service.check_connection()
-    overall_status = "ok"
-    response_status_code = status.HTTP_200_OK
-
-    if not model_loaded or not scaler_loaded or db_status["status"] != "ok":
-        overall_status = "degraded"
-        response_status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-
-    health_response = {
-        "status": overall_status,
-        "model_loaded": model_loaded,
-        "scaler_loaded": scaler_loaded,
-        "database": db_status,
-        "version": config.version,
-    }
+    try:
+        model_service.rollback(version)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return model_service.versions()
 
-    if overall_status != "ok":
-        return JSONResponse(status_code=response_status_code, content=health_response)
 
-    return health_response
+@router.get(
+    "/admin/profiler",
+    response_model=ProfilerStatus,
+    summary="Sampling profiler status",
+    description="Returns whether the profiler runs and the functions with the most samples.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def profiler_status(profiler: StackSampler = Depends(get_profiler)):
+    return profiler.describe()
+
+
+@router.post(
+    "/admin/profiler/start",
+    response_model=ProfilerStatus,
+    summary="Start the sampling profiler",
+    description="""
+Samples the stacks of all threads every `interval_ms` milliseconds until stopped.
+Previous samples are discarded unless `reset=false`.
+""",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def start_profiler(
+    interval_ms: Optional[float] = Query(None, gt=0),
+    reset: bool = True,
+    profiler: StackSampler = Depends(get_profiler),
+):
+    profiler.start(interval_ms, reset=reset)
+    return profiler.describe()
+
+
+@router.post(
+    "/admin/profiler/stop",
+    response_model=ProfilerStatus,
+    summary="Stop the sampling profiler",
+    description="Stops sampling and keeps the collected samples for inspection.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def stop_profiler(profiler: StackSampler = Depends(get_profiler)):
+    await asyncio.get_running_loop().run_in_executor(None, profiler.stop)
+    return profiler.describe()
+
+
+@router.get(
+    "/admin/profiler/stacks",
+    response_class=PlainTextResponse,
+    summary="Collapsed profiler stacks",
+    description="Sampled stacks in the collapsed format read by flamegraph.pl and speedscope.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def profiler_stacks(
+    limit: Optional[int] = None, profiler: StackSampler = Depends(get_profiler)
+):
+    return profiler.collapsed(limit)
@@ -1,18 +1,22 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
 
 class Config:
-    def __init__(self):
+    def __init__(self, require_database: bool = True):
         load_dotenv(dotenv_path="./.env")
 
-        # Required enviroment variables
+        # Required enviroment variables, offline tools such as score_bulk.py skip the database
         required_env = []
         if os.getenv("USE_IAM_AUTH", "false").lower() != "true":
             # If IAM is not used, then traditional credentials are required
-            required_env.extend(["DB_HOST", "MODEL_BUCKET"])
-            if os.getenv("DB_IAM_AUTH", "false").lower() != "true":
+            if require_database:
+                required_env.append("DB_HOST")
+            if not os.getenv("MODEL_SOURCE"):
+                required_env.append("MODEL_BUCKET")
+            if require_database and os.getenv("DB_IAM_AUTH", "false").lower() != "true":
                 required_env.extend(["DB_USER", "DB_PASSWORD"])
 
         missing = [var for var in required_env if not os.getenv(var)]
@@ -23,6 +27,84 @@ class Config:
         self.model_bucket = os.getenv("MODEL_BUCKET")
         self.model_prefix = os.getenv("MODEL_PREFIX", "tf_model")
         self.use_iam_auth = os.getenv("USE_IAM_AUTH", "false").lower() == "true"
+        # Optional endpoint for S3-compatible stand-ins (MinIO, moto, LocalStack)
+        self.s3_endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
+
+        # Model artifacts: s3://bucket/prefix or file:///local/dir, cached on local disk
+        self.model_source = (
+            os.getenv("MODEL_SOURCE") or f"s3://{self.model_bucket}/{self.model_prefix}"
+        )
+        self.model_cache_dir = os.getenv(
+            "MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "diabetes-ml-model-cache")
+        )
+        # Cache validated less than this many seconds ago is used without listing the source
+        self.model_cache_max_age = float(os.getenv("MODEL_CACHE_MAX_AGE", "300"))
+        self.model_download_workers = int(os.getenv("MODEL_DOWNLOAD_WORKERS", "4"))
+        # Seconds between checks of MODEL_SOURCE for a new model version, 0 disables polling
+        self.model_poll_interval = float(os.getenv("MODEL_POLL_INTERVAL", "60"))
+        # Previously active versions kept in memory for instant rollback
+        self.model_history_size = int(os.getenv("MODEL_HISTORY_SIZE", "2"))
+        # Token required in the X-Admin-Token header by /admin endpoints, unset disables them
+        self.admin_token = os.getenv("ADMIN_TOKEN") or None
+
+        # Inference engine: "keras" (TensorFlow) or "numpy" (exported weights, no TensorFlow)
+        self.inference_engine = os.getenv("INFERENCE_ENGINE", "keras").lower()
+        if self.inference_engine not in ("keras", "numpy"):
+            raise EnvironmentError(f"Unsupported INFERENCE_ENGINE: {self.inference_engine}")
+
+        # Multi-process serving (app/serve.py): uvicorn worker processes, and whether the
+        # NumPy engine maps one shared file of folded weights instead of a private copy
+        self.api_workers = int(os.getenv("API_WORKERS", "1"))
+        if self.api_workers < 1:
+            raise EnvironmentError("API_WORKERS must be at least 1")
+        self.model_shared_weights = os.getenv("MODEL_SHARED_WEIGHTS", "true").lower() == "true"
+
+        # Admission control for the prediction endpoints (0 concurrent disables the limit)
+        self.admission_max_concurrent = int(os.getenv("ADMISSION_MAX_CONCURRENT", "64"))
+        self.admission_max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "256"))
+        self.admission_max_wait_ms = float(os.getenv("ADMISSION_MAX_WAIT_MS", "250"))
+        # Clients are identified by this header (falling back to their address)
+        self.admission_client_header = os.getenv("ADMISSION_CLIENT_HEADER", "X-Client-Id")
+        # "client-a=high,batch-jobs=low", everyone else is "normal"
+        self.admission_client_priorities = {}
+        for item in os.getenv("ADMISSION_CLIENT_PRIORITIES", "").split(","):
+            client, _, priority = (part.strip() for part in item.partition("="))
+            if not client:
+                continue
+            if priority.lower() not in ("high", "normal", "low"):
+                raise EnvironmentError(f"Unsupported admission priority for {client}: {priority}")
+            self.admission_client_priorities[client] = priority.lower()
+        # Per-client quota in requests per second (0 disables) and its burst size
+        self.admission_client_rate = float(os.getenv("ADMISSION_CLIENT_RATE", "0"))
+        self.admission_client_burst = float(os.getenv("ADMISSION_CLIENT_BURST", "0"))
+
+        # Batch prediction configuration
+        self.batch_max_rows = int(os.getenv("BATCH_MAX_ROWS", "1000"))
+
+        # Prediction cache (single-row /predict only)
+        self.prediction_cache = os.getenv("PREDICTION_CACHE", "true").lower() == "true"
+        self.prediction_cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "1024"))
+        self.prediction_cache_ttl = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+        self.prediction_cache_policy = os.getenv("PREDICTION_CACHE_POLICY", "lru").lower()
+        if self.prediction_cache_policy not in ("lru", "fifo"):
+            raise EnvironmentError(
+                f"Unsupported PREDICTION_CACHE_POLICY: {self.prediction_cache_policy}"
+            )
+        # Round features to this many decimals before keying, unset means exact match
+        decimals = os.getenv("PREDICTION_CACHE_QUANTIZE_DECIMALS")
+        self.prediction_cache_quantize_decimals = int(decimals) if decimals else None
+
+        # Feature drift monitoring against the scaler statistics
+        self.drift_monitor = os.getenv("DRIFT_MONITOR", "true").lower() == "true"
+        self.drift_bins = int(os.getenv("DRIFT_BINS", "10"))
+        # Rows after which history is down-weighted by half, 0 keeps all history
+        self.drift_window = int(os.getenv("DRIFT_WINDOW", "10000"))
+        self.drift_min_samples = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+
+        # Micro-batching of concurrent single-row predictions
+        self.inference_batching = os.getenv("INFERENCE_BATCHING", "true").lower() == "true"
+        self.inference_batch_max_size = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "32"))
+        self.inference_batch_max_wait_ms = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "5"))
 
         # DB configuration
         self.db_host = os.getenv("DB_HOST")
@@ -35,6 +117,73 @@ class Config:
         self.db_iam_auth = os.getenv("DB_IAM_AUTH", "false").lower() == "true"
         self.db_ssl_mode = os.getenv("DB_SSL_MODE", "require")
         self.db_connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+        self.db_acquire_timeout = float(os.getenv("DB_ACQUIRE_TIMEOUT", "5"))
+        # RDS IAM tokens are valid for 15 minutes, new connections use a token younger than this
+        self.db_iam_token_refresh = int(os.getenv("DB_IAM_TOKEN_REFRESH", "600"))
+
+        # Execution model: inference and blocking I/O run on separate thread pools
+        self.inference_workers = int(
+            os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+        self.io_workers = int(os.getenv("IO_WORKERS", "4"))
+        self.event_loop_lag_interval = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+        # Background health monitor, /health and the probes serve its last result
+        self.health_check_interval = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+        if self.health_check_interval <= 0:
+            raise EnvironmentError("HEALTH_CHECK_INTERVAL must be positive")
+        self.health_check_timeout = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+        # Sampling profiler, started at boot when enabled and otherwise via /admin/profiler
+        self.profiler_enabled = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+        self.profiler_interval_ms = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+
+        # Buffered prediction-log writer
+        self.log_queue_max = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+        self.log_flush_size = int(os.getenv("LOG_FLUSH_SIZE", "500"))
+        self.log_flush_interval_ms = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "1000"))
+        self.log_overflow_policy = os.getenv("LOG_OVERFLOW_POLICY", "block").lower()
+        if self.log_overflow_policy not in ("block", "drop_oldest", "spill"):
+            raise EnvironmentError(f"Unsupported LOG_OVERFLOW_POLICY: {self.log_overflow_policy}")
+        # Each process spills to LOG_SPILL_PATH with its pid added before the extension
+        self.log_spill_path = os.getenv("LOG_SPILL_PATH", "./prediction_log_spill.jsonl")
+        # Spilled rows are written back every this many seconds while the queue is empty
+        self.log_spill_replay_interval = float(os.getenv("LOG_SPILL_REPLAY_INTERVAL", "60"))
+        self.log_drain_timeout = float(os.getenv("LOG_DRAIN_TIMEOUT", "10"))
+
+        # Prediction read-back: rows of recently created request IDs kept in memory for
+        # lookups, and rows per history page (also the largest page a client can ask for)
+        self.recent_predictions_size = int(os.getenv("RECENT_PREDICTIONS_SIZE", "10000"))
+        self.recent_predictions_ttl = float(os.getenv("RECENT_PREDICTIONS_TTL", "600"))
+        self.prediction_history_page_size = int(os.getenv("PREDICTION_HISTORY_PAGE_SIZE", "1000"))
+
+        # Streaming /stats aggregates (relative accuracy of the quantile sketches)
+        self.stats_sketch_accuracy = float(os.getenv("STATS_SKETCH_ACCURACY", "0.01"))
+        if not 0 < self.stats_sketch_accuracy < 1:
+            raise EnvironmentError("STATS_SKETCH_ACCURACY must be between 0 and 1")
+
+        # Logs table partitioning, retention and hourly rollups
+        self.log_partition_interval = os.getenv("LOG_PARTITION_INTERVAL", "day").lower()
+        if self.log_partition_interval not in ("day", "month"):
+            raise EnvironmentError(
+                f"Unsupported LOG_PARTITION_INTERVAL: {self.log_partition_interval}"
+            )
+        self.log_partitions_ahead = int(os.getenv("LOG_PARTITIONS_AHEAD", "3"))
+        self.log_retention_days = int(os.getenv("LOG_RETENTION_DAYS", "90"))
+        self.log_maintenance_interval = float(os.getenv("LOG_MAINTENANCE_INTERVAL", "300"))
+        self.log_rollup_lookback_hours = int(os.getenv("LOG_ROLLUP_LOOKBACK_HOURS", "2"))
+
+        # Application logging: queued and written by a background thread, as JSON or text
+        self.app_log_level = os.getenv("APP_LOG_LEVEL", "INFO").upper()
+        if self.app_log_level not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+            raise EnvironmentError(f"Unsupported APP_LOG_LEVEL: {self.app_log_level}")
+        self.app_log_format = os.getenv("APP_LOG_FORMAT", "json").lower()
+        if self.app_log_format not in ("json", "text"):
+            raise EnvironmentError(f"Unsupported APP_LOG_FORMAT: {self.app_log_format}")
+        self.app_log_queue_size = int(os.getenv("APP_LOG_QUEUE_SIZE", "10000"))
+        self.app_log_batch_size = int(os.getenv("APP_LOG_BATCH_SIZE", "256"))
+        # Per second and message template, records beyond the burst are kept at this rate
+        # (warnings and errors are never sampled, a burst of 0 disables sampling)
+        self.app_log_sample_burst = int(os.getenv("APP_LOG_SAMPLE_BURST", "50"))
+        self.app_log_sample_rate = float(os.getenv("APP_LOG_SAMPLE_RATE", "0.1"))
 
         # CloudWatch configuration
         self.enable_cloudwatch = os.getenv("ENABLE_CLOUDWATCH", "false").lower() == "true"
@@ -3,9 +3,9 @@ from contextlib import asynccontextmanager
 import uvicorn
 from app.api.endpoints import router
 from app.config import Config
-from app.services.db_service import DatabaseService
-from app.services.model_service import ModelService
+from app.services.registry import ServiceRegistry
 from app.utils.loggings import setup_logging
+from app.utils.tracing import TraceMiddleware
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
@@ -13,17 +13,15 @@ from prometheus_fastapi_instrumentator import Instrumentator
 config = Config()
 logger = setup_logging(config)
 
-# Initialize services
-model_service = ModelService(config)
-db_service = DatabaseService(config)
-
 
 # Define lifespan for startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # All services are created and initialized once, here
+    services = ServiceRegistry(config)
     try:
-        model_service.initialize()
-        db_service.initialize()
+        await services.initialize()
+        app.state.services = services
         logger.info("Application initialized successfully")
     except Exception as e:
         logger.critical(f"Critical error during initialization: {str(e)}")
@@ -32,7 +30,7 @@ async def lifespan(app: FastAPI):
     yield  # App is running
 
     try:
-        model_service.cleanup()
+        await services.shutdown()
         logger.info("Resources released successfully")
     except Exception as e:
         logger.error(f"Error while releasing resources: {str(e)}")
@@ -49,6 +47,9 @@ app = FastAPI(
 # Include API router
 app.include_router(router)
 
+# Trace IDs and per-stage timings for every request
+app.add_middleware(TraceMiddleware)
+
 # Enable Prometheus metrics
 Instrumentator().instrument(app).expose(app)
 
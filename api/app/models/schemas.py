@@ -1,5 +1,5 @@
 import math
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -33,6 +33,71 @@ class PredictionResponse(BaseModel):
         ..., description="UTC timestamp when the prediction was made (ISO format)"
     )
     request_id: str = Field(..., description="Unique identifier for the request")
+    model_version: str = Field(..., description="Version of the model that made the prediction")
+
+
+class BatchInputData(BaseModel):
+    rows: List[Any] = Field(
+        ...,
+        min_length=1,
+        description="Rows to score, each an object with input features x1..x10",
+    )
+
+
+class BatchPredictionItem(BaseModel):
+    request_id: str = Field(..., description="Unique identifier for the row")
+    prediction: Optional[float] = Field(
+        None, description="Predicted value from the model, null if the row failed"
+    )
+    status: str = Field(..., description="Row status ('ok' or 'error')")
+    error: Optional[str] = Field(None, description="Reason the row could not be scored")
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[BatchPredictionItem] = Field(
+        ..., description="Per-row results in the same order as the input rows"
+    )
+    succeeded: int = Field(..., description="Number of rows scored successfully")
+    failed: int = Field(..., description="Number of rows that could not be scored")
+    model_version: Optional[str] = Field(
+        None, description="Version of the model that scored the batch"
+    )
+    timestamp: str = Field(..., description="UTC timestamp when the batch was scored (ISO format)")
+
+
+class PredictionRecord(BaseModel):
+    request_id: str = Field(..., description="Request ID returned when the prediction was made")
+    timestamp: str = Field(..., description="UTC timestamp when the prediction was logged")
+    features: List[Optional[float]] = Field(
+        ..., description="Input features x1..x10 (null where the input was NaN or infinite)"
+    )
+    prediction: Optional[float] = Field(None, description="Predicted value (-1 for failed rows)")
+    status: str = Field(..., description="Prediction status ('ok' or 'error')")
+    error: Optional[str] = Field(None, description="Reason the prediction failed")
+    processing_time: Optional[float] = Field(None, description="Model response time in seconds")
+    model_version: Optional[str] = Field(None, description="Model version that made the prediction")
+
+
+class PredictionHistoryPage(BaseModel):
+    items: List[PredictionRecord] = Field(..., description="Logged predictions of this page")
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to get the next page, null on the last page"
+    )
+
+
+class ModelVersionInfo(BaseModel):
+    version: str = Field(..., description="Content hash of the model and scaler artifacts")
+    engine: str = Field(..., description="Inference engine serving this version")
+    loaded_at: str = Field(..., description="UTC timestamp when the version was loaded")
+
+
+class ModelVersionsResponse(BaseModel):
+    active: Optional[ModelVersionInfo] = Field(
+        None, description="Version currently serving predictions"
+    )
+    history: List[ModelVersionInfo] = Field(
+        ..., description="Previously active versions kept loaded for rollback, newest first"
+    )
 
 
 class HealthResponse(BaseModel):
@@ -49,3 +114,70 @@ class HealthResponse(BaseModel):
         ..., description="Status and metrics related to the database connection"
     )
     version: str = Field(..., description="API version currently running")
+    checked_at: Optional[str] = Field(
+        None, description="UTC timestamp of the background check this status comes from"
+    )
+    age_seconds: Optional[float] = Field(None, description="Seconds since the background check ran")
+    reasons: List[str] = Field(
+        default_factory=list, description="Why the instance is not healthy, empty when ok"
+    )
+
+
+class ProbeResponse(BaseModel):
+    status: str = Field(..., description="'ok', or why the probe failed ('degraded', 'starting')")
+    reasons: List[str] = Field(
+        default_factory=list, description="Why the instance is not ready, empty when ok"
+    )
+
+
+class DistributionSummary(BaseModel):
+    count: int = Field(..., description="Number of recorded values")
+    mean: Optional[float] = Field(None, description="Mean of the recorded values")
+    min: Optional[float] = Field(None, description="Smallest recorded value")
+    max: Optional[float] = Field(None, description="Largest recorded value")
+    p50: Optional[float] = Field(None, description="Estimated median")
+    p90: Optional[float] = Field(None, description="Estimated 90th percentile")
+    p95: Optional[float] = Field(None, description="Estimated 95th percentile")
+    p99: Optional[float] = Field(None, description="Estimated 99th percentile")
+
+
+class StatsResponse(BaseModel):
+    since: str = Field(..., description="UTC timestamp when aggregation started (ISO format)")
+    processing_time: DistributionSummary = Field(
+        ..., description="Distribution of prediction processing time in seconds"
+    )
+    prediction: DistributionSummary = Field(
+        ..., description="Distribution of successfully predicted values"
+    )
+    status_counts: Dict[str, int] = Field(..., description="Number of predictions by status")
+    throughput: Dict[str, float] = Field(
+        ..., description="Predictions per second over sliding windows (1m, 5m, 15m)"
+    )
+
+
+class FeatureDrift(BaseModel):
+    psi: Optional[float] = Field(None, description="Population stability index")
+    mean_shift: Optional[float] = Field(
+        None, description="Live mean minus training mean, in training standard deviations"
+    )
+    variance_ratio: Optional[float] = Field(
+        None, description="Live variance over training variance"
+    )
+
+
+class DriftResponse(BaseModel):
+    samples: float = Field(..., description="Weighted number of rows behind the scores")
+    features: Dict[str, FeatureDrift] = Field(..., description="Drift scores per input feature")
+
+
+class ProfiledFunction(BaseModel):
+    function: str = Field(..., description="Source file and function name")
+    samples: int = Field(..., description="Samples in which the function was running")
+    share: float = Field(..., description="Fraction of all non-idle samples")
+
+
+class ProfilerStatus(BaseModel):
+    running: bool = Field(..., description="Whether the sampling profiler is running")
+    interval_ms: float = Field(..., description="Milliseconds between stack samples")
+    samples: int = Field(..., description="Number of sampling rounds taken")
+    top: List[ProfiledFunction] = Field(..., description="Functions with the most samples")
@@ -0,0 +1,28 @@
+import uvicorn
+from app.config import Config
+from app.services.model_service import ModelService
+from app.utils.loggings import setup_logging
+
+# Entry point for multi-process serving: python -m app.serve
+config = Config()
+logger = setup_logging(config)
+
+
+def main():
+    if config.inference_engine == "numpy" and config.model_shared_weights:
+        # Fold and pack the weights once, so every worker only maps the shared file
+        version = ModelService(config).prepare_shared_weights()
+        logger.info(
+            f"Shared weights of model version {version} ready for {config.api_workers} workers"
+        )
+    elif config.api_workers > 1:
+        logger.warning(
+            f"Each of the {config.api_workers} workers loads its own model copy, "
+            f"set INFERENCE_ENGINE=numpy and MODEL_SHARED_WEIGHTS=true to share the weights"
+        )
+
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, workers=config.api_workers)
+
+
+if __name__ == "__main__":
+    main()
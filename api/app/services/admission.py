@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+from app.config import Config
+from app.utils.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_SHED,
+)
+from app.utils.tracing import record_stage
+
+# Waiting requests are served highest priority first; a request is only queued while the
+# queue is below its priority's share of ADMISSION_MAX_QUEUE, so low priority sheds first
+PRIORITIES = ("high", "normal", "low")
+QUEUE_SHARE = {"high": 1.0, "normal": 0.75, "low": 0.25}
+
+# Clients whose quota buckets are remembered, least recently seen are forgotten first
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    # Raised instead of queueing, carries the HTTP status and the Retry-After hint
+    def __init__(self, status_code: int, reason: str, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class AdmissionController:
+    # Bounded concurrency for the prediction endpoints. Requests over the limit wait in a
+    # priority queue for at most ADMISSION_MAX_WAIT_MS; a full queue or a wait that runs
+    # out is answered with 503 right away, and clients over their quota get 429.
+    def __init__(self, config: Config):
+        self.max_concurrent = config.admission_max_concurrent
+        self.max_queue = config.admission_max_queue
+        self.max_wait = config.admission_max_wait_ms / 1000
+        self.client_header = config.admission_client_header
+        self.client_priorities = config.admission_client_priorities
+        self.rate = config.admission_client_rate
+        self.burst = config.admission_client_burst or max(1.0, self.rate)
+        self.in_flight = 0
+        self.waiting = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        # Smoothed time a request holds its slot, used for the Retry-After estimate
+        self._hold_time = 0.01
+
+        ADMISSION_IN_FLIGHT.set_function(lambda: self.in_flight)
+        ADMISSION_QUEUE_DEPTH.set_function(lambda: self.waiting)
+
+    def priority_of(self, client: str) -> str:
+        return self.client_priorities.get(client, "normal")
+
+    async def acquire(self, client: str) -> float:
+        # Wait for a slot, returns the time it was granted for release()
+        priority = self.priority_of(client)
+        self._check_quota(client, priority)
+        if self.max_concurrent <= 0:
+            self.in_flight += 1
+            return time.monotonic()
+
+        if self.in_flight < self.max_concurrent and not self.waiting:
+            self.in_flight += 1
+            return time.monotonic()
+
+        if self.waiting >= self.max_queue * QUEUE_SHARE[priority]:
+            self._shed("queue_full", priority)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (PRIORITIES.index(priority), next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # release() may have granted the slot just as the wait ended; it already took the
+            # request off the waiting count then, otherwise it is done here
+            granted = future.done() and not future.cancelled()
+            if not granted:
+                self.waiting -= 1
+            if isinstance(e, asyncio.CancelledError):
+                # Client went away; hand back the slot if it was granted in the meantime
+                if granted:
+                    self.release(time.monotonic())
+                raise
+            if not granted:
+                self._observe_wait(priority, started)
+                self._shed("queue_timeout", priority)
+        self._observe_wait(priority, started)
+        return time.monotonic()
+
+    def release(self, granted_at: float):
+        # Hand the slot straight to the next live waiter, or free it
+        self._hold_time = 0.9 * self._hold_time + 0.1 * (time.monotonic() - granted_at)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            # Waiters that timed out or disconnected are left in the heap and skipped here
+            if not future.done():
+                self.waiting -= 1
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _check_quota(self, client: str, priority: str):
+        # Token bucket per client: ADMISSION_CLIENT_RATE per second, up to the burst size
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[client] = (tokens, now)
+            retry_after = math.ceil((1 - tokens) / self.rate)
+            ADMISSION_SHED.labels(reason="quota", priority=priority).inc()
+            raise AdmissionRejected(
+                429, "quota", retry_after, f"Client quota of {self.rate:g} requests/s exceeded"
+            )
+        self._buckets[client] = (tokens - 1, now)
+        if len(self._buckets) > MAX_TRACKED_CLIENTS:
+            self._buckets.popitem(last=False)
+
+    def _shed(self, reason: str, priority: str):
+        # Expected time until the queue ahead drains through the available slots
+        slots = max(1, self.max_concurrent)
+        retry_after = max(1, math.ceil(self.waiting * self._hold_time / slots))
+        ADMISSION_SHED.labels(reason=reason, priority=priority).inc()
+        raise AdmissionRejected(503, reason, retry_after, "Server is overloaded, retry later")
+
+    @staticmethod
+    def _observe_wait(priority: str, started: float):
+        waited = time.perf_counter() - started
+        ADMISSION_QUEUE_WAIT.labels(priority=priority).observe(waited)
+        record_stage("admission", waited)
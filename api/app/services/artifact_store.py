@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from app.config import Config
+from app.utils.startup import startup_timer
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class ArtifactStore:
+    def __init__(self, config: Config):
+        self.config = config
+        self.source = config.model_source
+        parsed = urlparse(self.source)
+        self.scheme = parsed.scheme
+        if self.scheme == "s3":
+            self.bucket = parsed.netloc
+            self.prefix = parsed.path.lstrip("/").rstrip("/")
+        elif self.scheme == "file":
+            self.root = parsed.path
+        else:
+            raise ValueError(f"Unsupported model source: {self.source}")
+
+        self.cache_dir = config.model_cache_dir
+        source_id = hashlib.sha256(self.source.encode()).hexdigest()[:16]
+        self.manifest_path = os.path.join(self.cache_dir, "manifests", f"{source_id}.json")
+        # MD5 of local source files by (path, size, mtime), so polls only hash changed files
+        self._local_etags = {}
+        self._s3 = None
+
+    def sync(self, force: bool = False) -> Dict[str, str]:
+        # Make the cache match the source and return artifact name -> local path
+        manifest = self._load_manifest()
+        if not force and manifest is not None and self._is_fresh(manifest):
+            logger.info("Model cache is warm, skipping fetch from %s", self.source)
+            return self._local_paths(manifest["objects"])
+
+        try:
+            objects = self.list_objects()
+        except Exception as e:
+            if manifest is not None and self._is_complete(manifest):
+                logger.warning("Could not list %s, using cached artifacts: %s", self.source, e)
+                return self._local_paths(manifest["objects"])
+            raise
+
+        if not objects:
+            raise FileNotFoundError(f"No model files found under {self.source}")
+
+        missing = {
+            name: obj
+            for name, obj in objects.items()
+            if not os.path.exists(self._blob_path(name, obj["etag"]))
+        }
+        if missing:
+            logger.info(
+                "Fetching %d of %d model artifacts from %s", len(missing), len(objects), self.source
+            )
+            workers = max(1, min(self.config.model_download_workers, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as pool:
+                # list() re-raises the first download error
+                list(pool.map(lambda item: self._fetch(*item), missing.items()))
+        else:
+            logger.debug("All %d model artifacts are up to date in the cache", len(objects))
+
+        self._save_manifest(objects)
+        return self._local_paths(objects)
+
+    def list_objects(self) -> Dict[str, dict]:
+        # List artifacts at the source as name -> {"key", "etag", "size"}
+        if self.scheme == "file":
+            return self._list_local()
+        return self._list_s3()
+
+    def _list_s3(self) -> Dict[str, dict]:
+        s3 = self._s3_client()
+        objects = {}
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                name = obj["Key"].removeprefix(self.prefix).lstrip("/")
+                if name and not name.endswith("/"):
+                    etag = obj["ETag"].strip('"')
+                    objects[name] = {"key": obj["Key"], "etag": etag, "size": obj["Size"]}
+        return objects
+
+    def _list_local(self) -> Dict[str, dict]:
+        # A local directory stands in for the bucket prefix, MD5 plays the role of the ETag
+        objects = {}
+        etags = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                stat = os.stat(path)
+                signature = (path, stat.st_size, stat.st_mtime_ns)
+                etag = self._local_etags.get(signature)
+                if etag is None:
+                    with open(path, "rb") as f:
+                        etag = hashlib.md5(f.read()).hexdigest()
+                etags[signature] = etag
+                objects[name] = {"key": path, "etag": etag, "size": stat.st_size}
+        self._local_etags = etags
+        return objects
+
+    def _fetch(self, name: str, obj: dict):
+        # Download one artifact into its content-addressed slot, atomically
+        target = self._blob_path(name, obj["etag"])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".part")
+        os.close(fd)
+        try:
+            if self.scheme == "file":
+                shutil.copyfile(obj["key"], partial)
+            else:
+                self._s3_client().download_file(self.bucket, obj["key"], partial)
+            os.replace(partial, target)
+            logger.debug("Downloaded %s -> %s", obj["key"], target)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+    def _s3_client(self):
+        # Created once and shared by listings and downloads (boto3 clients are thread-safe).
+        # boto3 is imported on first use to keep it out of the import path; that first use is
+        # the startup sync, so only it counts towards the startup "import" phase.
+        if self._s3 is not None:
+            return self._s3
+        with startup_timer.phase("import"):
+            import boto3
+
+        if self.config.use_iam_auth:
+            # Use IAM for S3 authentication
+            self._s3 = boto3.client("s3", endpoint_url=self.config.s3_endpoint_url)
+        else:
+            # Use traditional credentials
+            self._s3 = boto3.client(
+                "s3",
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=os.getenv("AWS_REGION"),
+                endpoint_url=self.config.s3_endpoint_url,
+            )
+        return self._s3
+
+    def _blob_path(self, name: str, etag: str) -> str:
+        # Keep the original file name so loaders can infer the format from the extension
+        digest = hashlib.sha256(etag.encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, "blobs", digest, os.path.basename(name))
+
+    def _local_paths(self, objects: Dict[str, dict]) -> Dict[str, str]:
+        return {name: self._blob_path(name, obj["etag"]) for name, obj in objects.items()}
+
+    def _load_manifest(self) -> Optional[dict]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, objects: Dict[str, dict]):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        partial = f"{self.manifest_path}.part"
+        with open(partial, "w") as f:
+            json.dump({"source": self.source, "synced_at": time.time(), "objects": objects}, f)
+        os.replace(partial, self.manifest_path)
+
+    def _is_complete(self, manifest: dict) -> bool:
+        return all(os.path.exists(path) for path in self._local_paths(manifest["objects"]).values())
+
+    def _is_fresh(self, manifest: dict) -> bool:
+        # A recently validated, complete cache is used without touching the network
+        age = time.time() - manifest.get("synced_at", 0)
+        return age < self.config.model_cache_max_age and self._is_complete(manifest)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from app.utils.metrics import INFERENCE_BATCH_SIZE, INFERENCE_QUEUE_WAIT
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class InferenceBatcher:
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Tuple[np.ndarray, str]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        executor: Optional[Executor] = None,
+    ):
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        # Start the scheduler lazily on the running event loop
+        if self._task is None or self._task.done():
+            self.queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, feature_tuple: tuple) -> Tuple[float, str]:
+        # Queue a single row and wait for the batch it lands in to be scored
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((feature_tuple, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        # Collect requests arriving within the wait window, up to the maximum batch size
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._process(batch)
+
+    async def _process(self, batch: List[Tuple[tuple, asyncio.Future, float]]):
+        # Run one forward pass for the whole batch and hand results back to the waiters
+        started = time.perf_counter()
+        INFERENCE_BATCH_SIZE.observe(len(batch))
+        for _, _, enqueued in batch:
+            INFERENCE_QUEUE_WAIT.observe(started - enqueued)
+
+        features = np.array([feature_tuple for feature_tuple, _, _ in batch])
+        try:
+            predictions, version = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.predict_fn, features
+            )
+        except Exception as e:
+            logger.error("Batched inference failed for %d requests: %s", len(batch), e)
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result((float(prediction), version))
+
+    def stop(self):
+        # Stop the scheduler and fail any requests still waiting in the queue
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while self.queue is not None and not self.queue.empty():
+            _, future, _ = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference scheduler stopped"))
@@ -1,140 +1,303 @@
+import asyncio
 import logging
 import os
 import time
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Tuple
 
-import boto3
+import asyncpg
 from app.config import Config
-from psycopg2.pool import SimpleConnectionPool
+from app.services.migrations import apply_migrations
+from app.utils.metrics import (
+    DB_POOL_ACQUIRE_WAIT,
+    DB_POOL_CHECKOUT_FAILURES,
+    DB_POOL_IDLE,
+    DB_POOL_IN_USE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_SATURATION,
+    DB_POOL_SIZE,
+)
 
 logger = logging.getLogger("diabetes-ml")
 
+# Column order of the rows accepted by the bulk write methods
+LOG_COLUMNS = (
+    "timestamp",
+    "request_id",
+    *(f"x{i}" for i in range(1, 11)),
+    "prediction",
+    "status",
+    "error",
+    "processing_time",
+    "model_version",
+)
+
+# Postgres array types used to unnest rows in LOG_COLUMNS order
+LOG_COLUMN_TYPES = (
+    "timestamptz",
+    "varchar",
+    *(["float8"] * 10),
+    "float8",
+    "varchar",
+    "text",
+    "float8",
+    "varchar",
+)
+
 
 class DatabaseService:
     def __init__(self, config: Config):
         self.config = config
         self.pool = None
+        self._iam_token = None
+        self._iam_token_issued = 0.0
+        self.checkout_failures = 0
 
-    def initialize(self) -> bool:
-        # Initialize the database connection pool
+    async def initialize(self, migrate: bool = True) -> bool:
+        # Initialize the database connection pool; offline readers such as export_logs.py
+        # skip the migrations, so they can also run against a read replica
         try:
-            connect_params = {
-                "dbname": self.config.db_name,
-                "host": self.config.db_host,
-                "port": self.config.db_port,
-                "sslmode": self.config.db_ssl_mode,
-                "connect_timeout": self.config.db_connect_timeout,
-                "application_name": "diabetes-ml-app",
-            }
-
             if self.config.db_iam_auth:
-                rds = boto3.client("rds")
-                token = rds.generate_db_auth_token(
-                    DBHostname=self.config.db_host,
-                    Port=self.config.db_port,
-                    DBUsername=self.config.db_user,
-                    Region=os.getenv("AWS_REGION", "us-east-1"),
-                )
-                connect_params["user"] = self.config.db_user
-                connect_params["password"] = token
+                # Called for every new connection, so pooled reconnects get a fresh token
+                password = self._iam_password
             else:
-                connect_params["user"] = self.config.db_user
-                connect_params["password"] = self.config.db_password
+                password = self.config.db_password
 
-            self.pool = SimpleConnectionPool(
-                self.config.db_pool_min, self.config.db_pool_max, **connect_params
+            self.pool = await asyncpg.create_pool(
+                host=self.config.db_host,
+                port=self.config.db_port,
+                user=self.config.db_user,
+                password=password,
+                database=self.config.db_name,
+                ssl=self.config.db_ssl_mode,
+                timeout=self.config.db_connect_timeout,
+                min_size=self.config.db_pool_min,
+                max_size=self.config.db_pool_max,
+                server_settings={"application_name": "diabetes-ml-app"},
             )
+            self._register_pool_metrics()
 
-            self._ensure_table_exists()
+            if migrate:
+                await self._ensure_table_exists()
             logger.info("Database connection initialized successfully")
             return True
 
         except Exception as e:
-            logger.critical(f"Database initialization failed: {str(e)}")
+            logger.critical("Database initialization failed: %s", e)
             raise
 
-    def _ensure_table_exists(self):
-        # Ensure the logs table exists, create if not present
+    def _iam_password(self) -> str:
+        # Return a cached RDS IAM auth token, regenerating it before it expires
+        if (
+            self._iam_token is None
+            or time.monotonic() - self._iam_token_issued > self.config.db_iam_token_refresh
+        ):
+            import boto3
+
+            rds = boto3.client("rds")
+            self._iam_token = rds.generate_db_auth_token(
+                DBHostname=self.config.db_host,
+                Port=self.config.db_port,
+                DBUsername=self.config.db_user,
+                Region=os.getenv("AWS_REGION", "us-east-1"),
+            )
+            self._iam_token_issued = time.monotonic()
+            logger.info("Generated new RDS IAM auth token")
+        return self._iam_token
+
+    def _register_pool_metrics(self):
+        # Pool gauges are read from the live pool at scrape time
+        DB_POOL_SIZE.set_function(lambda: self.pool_stats()["size"])
+        DB_POOL_IDLE.set_function(lambda: self.pool_stats()["idle"])
+        DB_POOL_IN_USE.set_function(lambda: self.pool_stats()["in_use"])
+        DB_POOL_MAX_SIZE.set_function(lambda: self.pool_stats()["max_size"])
+        DB_POOL_SATURATION.set_function(lambda: self.pool_stats()["saturation"])
+
+    def pool_stats(self) -> dict:
+        # Snapshot of pool occupancy
+        if self.pool is None:
+            return {
+                "size": 0,
+                "idle": 0,
+                "in_use": 0,
+                "max_size": 0,
+                "saturation": 0.0,
+                "checkout_failures": self.checkout_failures,
+            }
+
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        max_size = self.pool.get_max_size()
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "max_size": max_size,
+            "saturation": round((size - idle) / max_size, 3),
+            "checkout_failures": self.checkout_failures,
+        }
+
+    async def _ensure_table_exists(self):
+        # Bring the logs schema up to date through the versioned migrations
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        CREATE TABLE IF NOT EXISTS logs (
-                            id SERIAL PRIMARY KEY,
-                            timestamp TIMESTAMPTZ NOT NULL,
-                            request_id VARCHAR(50),
-                            x1 FLOAT, x2 FLOAT, x3 FLOAT, x4 FLOAT, x5 FLOAT,
-                            x6 FLOAT, x7 FLOAT, x8 FLOAT, x9 FLOAT, x10 FLOAT,
-                            prediction FLOAT,
-                            status VARCHAR(20),
-                            processing_time FLOAT
-                        )
-                    """
-                    )
-                    conn.commit()
-                    logger.info("Verified that logs table exists")
+            async with self.get_connection() as conn:
+                applied = await apply_migrations(conn, self.config)
+                logger.info("Verified logs schema (%d migrations applied)", applied)
         except Exception as e:
-            logger.critical(f"Failed to create or verify logs table: {str(e)}")
+            logger.critical("Failed to create or verify logs table: %s", e)
             raise
 
-    @contextmanager
-    def get_connection(self):
-        # Context manager for getting a connection from the pool
-        conn = self.pool.getconn()
+    @asynccontextmanager
+    async def get_connection(self):
+        # Context manager for getting a connection from the pool, recording the wait
+        # and counting checkouts that time out or fail
+        start_time = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=self.config.db_acquire_timeout)
+        except Exception as e:
+            self.checkout_failures += 1
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            DB_POOL_CHECKOUT_FAILURES.labels(reason=reason).inc()
+            raise
+        DB_POOL_ACQUIRE_WAIT.observe(time.perf_counter() - start_time)
         try:
             yield conn
         finally:
-            self.pool.putconn(conn)
+            await self.pool.release(conn)
 
-    def log_prediction(
+    async def log_prediction(
         self,
         request_id: str,
         features: List[float],
         prediction: float,
         status: str,
         processing_time: float,
+        model_version: Optional[str] = None,
+        error: Optional[str] = None,
     ):
         # Log prediction results to the database
         try:
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        INSERT INTO logs
-                            (timestamp, request_id, x1, x2, x3, x4, x5, x6, x7, x8, x9, x10,
-                             prediction, status, processing_time)
-                        VALUES
-                            (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                        (
-                            datetime.now(timezone.utc),
-                            request_id,
-                            *features,
-                            prediction,
-                            status,
-                            processing_time,
-                        ),
-                    )
-                    conn.commit()
+            async with self.get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO logs
+                        (timestamp, request_id, x1, x2, x3, x4, x5, x6, x7, x8, x9, x10,
+                         prediction, status, error, processing_time, model_version)
+                    VALUES
+                        ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17)
+                """,
+                    datetime.now(timezone.utc),
+                    request_id,
+                    *features,
+                    prediction,
+                    status,
+                    error,
+                    processing_time,
+                    model_version,
+                )
         except Exception as e:
-            logger.error(f"Failed to log prediction to database: {str(e)}")
+            logger.error("Failed to log prediction to database: %s", e)
+
+    async def copy_predictions(self, rows: List[tuple]):
+        # Bulk load prediction rows (in LOG_COLUMNS order) with a single COPY
+        async with self.get_connection() as conn:
+            await conn.copy_records_to_table("logs", records=rows, columns=LOG_COLUMNS)
+
+    async def insert_predictions(self, rows: List[tuple]):
+        # Insert prediction rows (in LOG_COLUMNS order) with one multi-row INSERT
+        columns = list(zip(*rows))
+        unnest_args = ", ".join(
+            f"${i}::{column_type}[]" for i, column_type in enumerate(LOG_COLUMN_TYPES, start=1)
+        )
+        async with self.get_connection() as conn:
+            await conn.execute(
+                f"INSERT INTO logs ({', '.join(LOG_COLUMNS)}) SELECT * FROM unnest({unnest_args})",
+                *[list(column) for column in columns],
+            )
+
+    async def fetch_prediction(self, request_id: str) -> Optional[asyncpg.Record]:
+        # Latest log row of a request ID, looked up through logs_request_id_idx
+        async with self.get_connection() as conn:
+            return await conn.fetchrow(
+                f"SELECT {', '.join(LOG_COLUMNS)} FROM logs WHERE request_id = $1 "
+                "ORDER BY timestamp DESC LIMIT 1",
+                request_id,
+            )
 
-    def check_connection(self):
+    async def fetch_prediction_page(
+        self,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        descending: bool = False,
+        status: Optional[str] = None,
+    ) -> List[asyncpg.Record]:
+        # One keyset page of log rows with start <= timestamp < end, ordered by (timestamp, id)
+        # and read through logs_timestamp_id_idx. `after` is the (timestamp, id) of the last
+        # row of the previous page, so every page costs the same however deep it is.
+        conditions = ["timestamp >= $1", "timestamp < $2"]
+        args = [start, end]
+        if after is not None:
+            args.extend(after)
+            comparison = "<" if descending else ">"
+            conditions.append(f"(timestamp, id) {comparison} (${len(args) - 1}, ${len(args)})")
+        if status is not None:
+            args.append(status)
+            conditions.append(f"status = ${len(args)}")
+        direction = "DESC" if descending else "ASC"
+        args.append(limit)
+        async with self.get_connection() as conn:
+            return await conn.fetch(
+                f"SELECT id, {', '.join(LOG_COLUMNS)} FROM logs "
+                f"WHERE {' AND '.join(conditions)} "
+                f"ORDER BY timestamp {direction}, id {direction} LIMIT ${len(args)}",
+                *args,
+            )
+
+    async def fetch_max_log_id(self) -> Optional[int]:
+        # Highest log row ID, IDs are assigned in insert order whatever the row timestamp
+        async with self.get_connection() as conn:
+            return await conn.fetchval("SELECT max(id) FROM logs")
+
+    async def fetch_predictions_by_id(
+        self, after_id: int, max_id: int, limit: int
+    ) -> List[asyncpg.Record]:
+        # Log rows with after_id < id <= max_id in insert order, read through the primary key
+        async with self.get_connection() as conn:
+            return await conn.fetch(
+                f"SELECT id, {', '.join(LOG_COLUMNS)} FROM logs "
+                "WHERE id > $1 AND id <= $2 ORDER BY id LIMIT $3",
+                after_id,
+                max_id,
+                limit,
+            )
+
+    async def check_connection(self):
         # Check connection health and return response time
         try:
-            start_time = time.time()
-            with self.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1")
+            start_time = time.perf_counter()
+            async with self.get_connection() as conn:
+                await conn.fetchval("SELECT 1")
 
-            response_time = time.time() - start_time
-            logger.debug(f"Database responded in {response_time:.3f} seconds")
+            response_time = time.perf_counter() - start_time
+            logger.debug("Database responded in %.3f seconds", response_time)
 
-            return {"status": "ok", "response_time_ms": round(response_time * 1000, 2)}
+            return {
+                "status": "ok",
+                "response_time_ms": round(response_time * 1000, 2),
+                "pool": self.pool_stats(),
+            }
 
         except Exception as e:
-            logger.warning(f"Database connection check failed: {str(e)}")
-            return {"status": "error", "message": str(e)}
+            # Pool checkout timeouts carry no message, report the exception type instead
+            message = str(e) or type(e).__name__
+            logger.warning("Database connection check failed: %s", message)
+            return {"status": "error", "message": message, "pool": self.pool_stats()}
+
+    async def close(self):
+        # Close all pooled connections
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
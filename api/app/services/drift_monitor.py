@@ -0,0 +1,194 @@
+import math
+from statistics import NormalDist
+from typing import Optional
+
+import numpy as np
+from app.utils.features import FEATURE_NAMES
+from app.utils.metrics import (
+    FEATURE_DRIFT_MEAN_SHIFT,
+    FEATURE_DRIFT_PSI,
+    FEATURE_DRIFT_SAMPLES,
+    FEATURE_DRIFT_VARIANCE_RATIO,
+)
+
+# Floor for empty histogram bins so PSI stays finite
+PSI_EPSILON = 1e-6
+
+# Bins of the reference histograms written by train_model.py
+DEFAULT_BINS = 10
+
+
+def reference_histograms(X, bins: int = DEFAULT_BINS) -> dict:
+    # Per-feature bin edges and the share of training rows in each bin, stored with the scaler
+    # as `drift_reference_`. Features with at most `bins` distinct values (e.g. the binary sex
+    # feature) get one bin per value, the others training quantile cuts. Unused trailing
+    # edges are +inf, so their bins stay empty on both sides.
+    X = np.asarray(X, dtype=np.float64)
+    edges = np.full((X.shape[1], bins - 1), np.inf)
+    expected = np.zeros((X.shape[1], bins))
+    for i in range(X.shape[1]):
+        column = X[:, i][np.isfinite(X[:, i])]
+        if column.size == 0:
+            expected[i, 0] = 1.0
+            continue
+        values = np.unique(column)
+        if len(values) <= bins:
+            cuts = (values[:-1] + values[1:]) / 2
+        else:
+            cuts = np.quantile(column, np.arange(1, bins) / bins)
+        edges[i, : len(cuts)] = cuts
+        counts = np.bincount((column[:, None] > edges[i]).sum(axis=1), minlength=bins)
+        expected[i] = counts / column.size
+    return {"edges": edges, "expected": expected}
+
+
+class DriftMonitor:
+    # Compares live feature vectors with the training statistics stored in the scaler.
+    # Keeps running moments (Welford) and a histogram per feature, never the rows themselves.
+    # Histogram bins come from the training histograms stored with the scaler; scalers saved
+    # without them fall back to normal-quantile cuts around the training mean, where each
+    # bin expects 1/bins of the traffic.
+    def __init__(self, bins: int = DEFAULT_BINS, window: int = 10000, min_samples: int = 100):
+        self.bins = max(2, bins)
+        self.window = window
+        self.min_samples = min_samples
+        self.scaler = None
+        self._feature_index = np.arange(len(FEATURE_NAMES))
+        self._cuts = np.array([NormalDist().inv_cdf(i / self.bins) for i in range(1, self.bins)])
+        self.reference = None
+        self._reset(np.zeros(len(FEATURE_NAMES)), np.ones(len(FEATURE_NAMES)), None)
+
+        for i, name in enumerate(FEATURE_NAMES):
+            FEATURE_DRIFT_PSI.labels(feature=name).set_function(lambda i=i: self.psi()[i])
+            FEATURE_DRIFT_MEAN_SHIFT.labels(feature=name).set_function(
+                lambda i=i: self.mean_shift()[i]
+            )
+            FEATURE_DRIFT_VARIANCE_RATIO.labels(feature=name).set_function(
+                lambda i=i: self.variance_ratio()[i]
+            )
+        FEATURE_DRIFT_SAMPLES.set_function(lambda: self.count)
+
+    def _reset(self, mean: np.ndarray, std: np.ndarray, reference: Optional[dict]):
+        self.reference_mean = mean
+        self.reference_std = std
+        self.reference = reference
+        if reference is not None:
+            self.edges = reference["edges"]
+            self.expected = reference["expected"]
+        else:
+            self.edges = mean[:, None] + std[:, None] * self._cuts[None, :]
+            bins = len(self._cuts) + 1
+            self.expected = np.full((len(mean), bins), 1.0 / bins)
+        self.bins = self.expected.shape[1]
+        self.count = 0.0
+        self.mean = np.zeros(len(mean))
+        self.m2 = np.zeros(len(mean))
+        self.histogram = np.zeros((len(mean), self.bins))
+
+    def _use_scaler(self, scaler):
+        # Switch the reference when a reload brings different training statistics
+        if scaler is self.scaler:
+            return
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        std = np.sqrt(np.asarray(scaler.var_, dtype=np.float64))
+        std[std == 0] = 1.0
+        reference = self._reference_of(scaler)
+        if (
+            self.scaler is None
+            or not np.array_equal(mean, self.reference_mean)
+            or not np.array_equal(std, self.reference_std)
+            or (reference is None) != (self.reference is None)
+            or (reference is not None and not np.array_equal(reference["edges"], self.edges))
+        ):
+            self._reset(mean, std, reference)
+        self.scaler = scaler
+
+    @staticmethod
+    def _reference_of(scaler) -> Optional[dict]:
+        # Training histograms saved with the scaler, None for older scalers or a mismatch
+        reference = getattr(scaler, "drift_reference_", None)
+        if not isinstance(reference, dict):
+            return None
+        edges = np.asarray(reference.get("edges"), dtype=np.float64)
+        expected = np.asarray(reference.get("expected"), dtype=np.float64)
+        features = len(FEATURE_NAMES)
+        if edges.ndim != 2 or edges.shape[0] != features:
+            return None
+        if expected.shape != (features, edges.shape[1] + 1):
+            return None
+        return {"edges": edges, "expected": expected}
+
+    def observe(self, features, scaler):
+        # Fold one row or a matrix of rows into the running statistics
+        self._use_scaler(scaler)
+        rows = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        n = len(rows)
+        if n == 0:
+            return
+
+        if n == 1:
+            # Single-row fast path for /predict (Welford update)
+            row = rows[0]
+            self.histogram[self._feature_index, (row[:, None] > self.edges).sum(axis=1)] += 1
+            self.count += 1
+            delta = row - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (row - self.mean)
+        else:
+            bins = (rows[:, :, None] > self.edges[None, :, :]).sum(axis=2)
+            flat = (bins + self._feature_index * self.bins).ravel()
+            self.histogram += np.bincount(flat, minlength=self.histogram.size).reshape(
+                self.histogram.shape
+            )
+            # Chan et al. parallel update of the running mean and sum of squared deviations
+            batch_mean = rows.mean(axis=0)
+            delta = batch_mean - self.mean
+            total = self.count + n
+            self.mean += delta * n / total
+            self.m2 += ((rows - batch_mean) ** 2).sum(axis=0) + delta**2 * self.count * n / total
+            self.count = total
+
+        if self.window and self.count >= self.window:
+            # Halve the weight of history so the scores follow recent traffic
+            self.count /= 2
+            self.m2 /= 2
+            self.histogram /= 2
+
+    def _ready(self) -> bool:
+        return self.scaler is not None and self.count >= self.min_samples
+
+    def psi(self) -> np.ndarray:
+        # Population stability index per feature against the expected training bin mass
+        if not self._ready():
+            return np.full(len(FEATURE_NAMES), math.nan)
+        observed = self.histogram / self.histogram.sum(axis=1, keepdims=True)
+        observed = np.clip(observed, PSI_EPSILON, None)
+        expected = np.clip(self.expected, PSI_EPSILON, None)
+        return ((observed - expected) * np.log(observed / expected)).sum(axis=1)
+
+    def mean_shift(self) -> np.ndarray:
+        # Live mean minus training mean, in training standard deviations
+        if not self._ready():
+            return np.full(len(FEATURE_NAMES), math.nan)
+        return (self.mean - self.reference_mean) / self.reference_std
+
+    def variance_ratio(self) -> np.ndarray:
+        # Live variance over training variance
+        if not self._ready():
+            return np.full(len(FEATURE_NAMES), math.nan)
+        return (self.m2 / self.count) / self.reference_std**2
+
+    def summary(self) -> dict:
+        # Scores per feature, None until min_samples rows were observed
+        scores = {"psi": self.psi(), "mean_shift": self.mean_shift()}
+        scores["variance_ratio"] = self.variance_ratio()
+        return {
+            "samples": self.count,
+            "features": {
+                name: {
+                    score: None if math.isnan(values[i]) else float(values[i])
+                    for score, values in scores.items()
+                }
+                for i, name in enumerate(FEATURE_NAMES)
+            },
+        }
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from app.config import Config
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class ExecutorService:
+    def __init__(self, config: Config):
+        self.config = config
+        # CPU-bound model inference runs on its own pool, sized to the available cores
+        self.inference = ThreadPoolExecutor(
+            max_workers=config.inference_workers, thread_name_prefix="inference"
+        )
+        # Blocking file and network I/O never competes with inference
+        self.io = ThreadPoolExecutor(max_workers=config.io_workers, thread_name_prefix="io")
+
+    async def run_io(self, fn, *args, **kwargs):
+        # Run a blocking I/O call without stalling the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io, partial(fn, *args, **kwargs))
+
+    def submit_io(self, fn, *args, **kwargs) -> Future:
+        # Fire-and-forget blocking I/O, errors are logged instead of propagated
+        future = self.io.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Background I/O task failed: %s", future.exception())
+
+    def cleanup(self):
+        # Let queued work (e.g. pending log writes) finish before exiting
+        self.inference.shutdown(wait=True)
+        self.io.shutdown(wait=True)
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import Config
+from app.services.db_service import DatabaseService
+from app.services.model_service import ModelService
+from app.utils.metrics import (
+    HEALTH_CHECK_AGE,
+    HEALTH_CHECK_DURATION,
+    HEALTH_COMPONENT_UP,
+    SERVICE_READY,
+)
+
+logger = logging.getLogger("diabetes-ml")
+
+# A cached status older than this many check intervals means the monitor itself is stuck
+STALE_INTERVALS = 3
+
+
+class HealthMonitor:
+    # Checks the components on an interval so /health and the probes are served from memory
+    # and never take a connection away from prediction traffic
+    def __init__(self, config: Config, model_service: ModelService, db_service: DatabaseService):
+        self.config = config
+        self.model_service = model_service
+        self.db_service = db_service
+        self.interval = config.health_check_interval
+        self.status: Optional[dict] = None
+        self._checked: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+        SERVICE_READY.set_function(lambda: 1 if self.ready else 0)
+        HEALTH_CHECK_AGE.set_function(lambda: self.age if self.age is not None else -1)
+
+    async def refresh(self) -> dict:
+        # Run one round of checks and replace the cached status
+        started = time.perf_counter()
+        model_loaded = self.model_service.model is not None
+        scaler_loaded = self.model_service.scaler is not None
+        try:
+            db_status = await asyncio.wait_for(
+                self.db_service.check_connection(), self.config.health_check_timeout
+            )
+        except asyncio.TimeoutError:
+            db_status = {
+                "status": "error",
+                "message": f"No response within {self.config.health_check_timeout:g}s",
+                "pool": self.db_service.pool_stats(),
+            }
+
+        model_up = model_loaded and scaler_loaded
+        database_up = db_status["status"] == "ok"
+        HEALTH_COMPONENT_UP.labels(component="model").set(1 if model_up else 0)
+        HEALTH_COMPONENT_UP.labels(component="database").set(1 if database_up else 0)
+
+        reasons = []
+        if not model_up:
+            reasons.append("model is not loaded")
+        if not database_up:
+            reasons.append(f"database: {db_status.get('message', db_status['status'])}")
+        overall_status = "degraded" if reasons else "ok"
+        if self.status is not None and self.status["status"] != overall_status:
+            if reasons:
+                logger.warning("Health check degraded: %s", "; ".join(reasons))
+            else:
+                logger.info("Health check recovered, instance is ready")
+
+        self.status = {
+            "status": overall_status,
+            "model_loaded": model_loaded,
+            "scaler_loaded": scaler_loaded,
+            "database": db_status,
+            "version": self.config.version,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "reasons": reasons,
+        }
+        self._checked = time.monotonic()
+        HEALTH_CHECK_DURATION.observe(time.perf_counter() - started)
+        return self.status
+
+    def start(self):
+        # Start the refresh loop on the running event loop
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Health check failed: %s", e)
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self._checked if self._checked is not None else None
+
+    @property
+    def ready(self) -> bool:
+        return self.snapshot()["status"] == "ok"
+
+    def snapshot(self) -> dict:
+        # Last cached status, degraded when it has not been refreshed for too long
+        if self.status is None:
+            return {
+                "status": "starting",
+                "model_loaded": False,
+                "scaler_loaded": False,
+                "database": {"status": "unknown"},
+                "version": self.config.version,
+                "reasons": ["startup has not completed"],
+            }
+
+        age = self.age
+        snapshot = {**self.status, "age_seconds": round(age, 3)}
+        if age > STALE_INTERVALS * self.interval:
+            snapshot["status"] = "degraded"
+            snapshot["reasons"] = [*snapshot["reasons"], f"health status is {age:.0f}s old"]
+        return snapshot
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import Config
+from app.services.db_service import DatabaseService
+from app.services.log_partitions import (
+    count_default_rows,
+    ensure_partition,
+    parse_partition_name,
+    partition_range,
+)
+from app.utils.metrics import LOG_DEFAULT_PARTITION_ROWS, LOG_MAINTENANCE_SECONDS
+
+logger = logging.getLogger("diabetes-ml")
+
+# Only one pod runs maintenance at a time
+MAINTENANCE_LOCK_ID = 7_310_011
+
+
+class LogMaintenance:
+    def __init__(self, config: Config, db_service: DatabaseService):
+        self.config = config
+        self.db_service = db_service
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        # Run maintenance every LOG_MAINTENANCE_INTERVAL seconds
+        if self._task is None and self.config.log_maintenance_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.config.log_maintenance_interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Log table maintenance failed: %s", e)
+
+    async def run_once(self) -> bool:
+        # Create upcoming partitions, drop expired ones and refresh hourly rollups
+        async with self.db_service.get_connection() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MAINTENANCE_LOCK_ID):
+                logger.debug("Log table maintenance is running elsewhere, skipping")
+                return False
+            try:
+                for step in (
+                    self.create_partitions,
+                    self.drop_expired_partitions,
+                    self.refresh_rollups,
+                ):
+                    await self._timed(step, conn)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", MAINTENANCE_LOCK_ID)
+        return True
+
+    async def _timed(self, step, conn):
+        start_time = time.perf_counter()
+        await step(conn)
+        LOG_MAINTENANCE_SECONDS.labels(step=step.__name__).observe(time.perf_counter() - start_time)
+
+    async def create_partitions(self, conn):
+        # Keep the current and the next LOG_PARTITIONS_AHEAD partitions in place
+        interval = self.config.log_partition_interval
+        moment = datetime.now(timezone.utc)
+        for _ in range(self.config.log_partitions_ahead + 1):
+            try:
+                await ensure_partition(conn, moment, interval)
+            except Exception as e:
+                logger.error("Could not create log partition for %s: %s", moment.date(), e)
+            moment = partition_range(moment, interval)[1]
+
+        # Rows only land in the default partition when no range partition covers them
+        default_rows = await count_default_rows(conn)
+        LOG_DEFAULT_PARTITION_ROWS.set(default_rows)
+        if default_rows:
+            logger.warning("%d log rows are in the default partition", default_rows)
+
+    async def drop_expired_partitions(self, conn):
+        # Drop whole partitions that are entirely older than the retention period
+        if self.config.log_retention_days <= 0:
+            return
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.config.log_retention_days)
+        partitions = await conn.fetch(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'logs'
+        """
+        )
+        for row in partitions:
+            bounds = parse_partition_name(row["relname"])
+            if bounds is not None and bounds[1] <= cutoff:
+                await conn.execute(f"DROP TABLE IF EXISTS {row['relname']}")
+                logger.info("Dropped expired log partition %s", row["relname"])
+
+    async def refresh_rollups(self, conn):
+        # Recompute recent hours, late rows from the buffered writer are picked up next run
+        since = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(
+            hours=self.config.log_rollup_lookback_hours
+        )
+        await conn.execute(
+            """
+            INSERT INTO logs_hourly AS r
+                (hour, model_version, status, request_count,
+                 prediction_avg, prediction_min, prediction_max,
+                 processing_time_avg, processing_time_p95, processing_time_max)
+            SELECT
+                date_trunc('hour', timestamp),
+                COALESCE(model_version, ''),
+                COALESCE(status, ''),
+                count(*),
+                avg(prediction), min(prediction), max(prediction),
+                avg(processing_time),
+                percentile_cont(0.95) WITHIN GROUP (ORDER BY processing_time),
+                max(processing_time)
+            FROM logs
+            WHERE timestamp >= $1
+            GROUP BY 1, 2, 3
+            ON CONFLICT (hour, model_version, status) DO UPDATE SET
+                request_count = EXCLUDED.request_count,
+                prediction_avg = EXCLUDED.prediction_avg,
+                prediction_min = EXCLUDED.prediction_min,
+                prediction_max = EXCLUDED.prediction_max,
+                processing_time_avg = EXCLUDED.processing_time_avg,
+                processing_time_p95 = EXCLUDED.processing_time_p95,
+                processing_time_max = EXCLUDED.processing_time_max
+        """,
+            since,
+        )
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
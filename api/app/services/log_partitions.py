@@ -0,0 +1,79 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+# Partitions are named after their start, logs_pYYYYMM (month) or logs_pYYYYMMDD (day)
+PARTITION_NAME = re.compile(r"^logs_p(\d{6}|\d{8})$")
+
+
+def partition_range(moment: datetime, interval: str) -> Tuple[datetime, datetime]:
+    # UTC bounds [start, end) of the partition containing the given moment
+    moment = moment.astimezone(timezone.utc)
+    if interval == "month":
+        start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+    return start, end
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    return f"logs_p{start:%Y%m}" if interval == "month" else f"logs_p{start:%Y%m%d}"
+
+
+def parse_partition_name(name: str) -> Optional[Tuple[datetime, datetime]]:
+    # Recover partition bounds from a name created by partition_name
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    digits = match.group(1)
+    if len(digits) == 6:
+        start = datetime.strptime(digits, "%Y%m").replace(tzinfo=timezone.utc)
+        return partition_range(start, "month")
+    start = datetime.strptime(digits, "%Y%m%d").replace(tzinfo=timezone.utc)
+    return partition_range(start, "day")
+
+
+async def ensure_partition(conn, moment: datetime, interval: str) -> str:
+    # Create the partition covering the given moment if it does not exist yet
+    start, end = partition_range(moment, interval)
+    name = partition_name(start, interval)
+    if await conn.fetchval("SELECT to_regclass($1)", name) is not None:
+        return name
+
+    create = (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    stranded = await conn.fetchval(
+        "SELECT EXISTS (SELECT 1 FROM logs_default WHERE timestamp >= $1 AND timestamp < $2)",
+        start,
+        end,
+    )
+    if not stranded:
+        await conn.execute(create)
+        return name
+
+    # Rows of this range already sit in the default partition, which would make the CREATE
+    # fail on every run. Detach it, create the partition, move the rows over and reattach.
+    async with conn.transaction():
+        await conn.execute("ALTER TABLE logs DETACH PARTITION logs_default")
+        await conn.execute(create)
+        await conn.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM logs_default WHERE timestamp >= $1 AND timestamp < $2 RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """,
+            start,
+            end,
+        )
+        await conn.execute("ALTER TABLE logs ATTACH PARTITION logs_default DEFAULT")
+    return name
+
+
+async def count_default_rows(conn) -> int:
+    # Rows outside every range partition, expected to stay at zero
+    return await conn.fetchval("SELECT count(*) FROM logs_default")
@@ -0,0 +1,320 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.services.db_service import LOG_COLUMNS, DatabaseService
+from app.services.executor_service import ExecutorService
+from app.services.prediction_history import RecentPredictions
+from app.utils.metrics import (
+    PREDICTION_LOG_DROPPED,
+    PREDICTION_LOG_FLUSH_LATENCY,
+    PREDICTION_LOG_FLUSH_ROWS,
+    PREDICTION_LOG_QUEUE_DEPTH,
+    PREDICTION_LOG_REPLAYED,
+    PREDICTION_LOG_SPILLED,
+)
+
+logger = logging.getLogger("diabetes-ml")
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PredictionLogWriter:
+    def __init__(
+        self,
+        config: Config,
+        db_service: DatabaseService,
+        executor_service: ExecutorService,
+        recent: Optional[RecentPredictions] = None,
+    ):
+        self.config = config
+        self.db_service = db_service
+        self.executor_service = executor_service
+        self.recent = recent
+        self.flush_size = max(1, config.log_flush_size)
+        self.flush_interval = config.log_flush_interval_ms / 1000
+        self.overflow_policy = config.log_overflow_policy
+        # Every process spills to <stem>.<pid><ext>, appends are serialized by the lock
+        self.spill_stem, self.spill_ext = os.path.splitext(config.log_spill_path)
+        self.spill_replay_interval = config.log_spill_replay_interval
+        self._spill_lock = threading.Lock()
+        self._next_replay = 0.0
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self):
+        # Start the background flusher on the running event loop
+        self.queue = asyncio.Queue(maxsize=self.config.log_queue_max)
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        PREDICTION_LOG_QUEUE_DEPTH.set_function(lambda: self.queue.qsize())
+        logger.info(
+            "Prediction log writer started (batch %d, interval %.2fs, overflow policy %s)",
+            self.flush_size,
+            self.flush_interval,
+            self.overflow_policy,
+        )
+
+    async def log_prediction(
+        self,
+        request_id: str,
+        features: List[float],
+        prediction: float,
+        status: str,
+        processing_time: float,
+        model_version: Optional[str] = None,
+        error: Optional[str] = None,
+    ):
+        # Queue a prediction result for the next bulk write
+        await self._enqueue(
+            (
+                datetime.now(timezone.utc),
+                request_id,
+                *features,
+                prediction,
+                status,
+                error,
+                processing_time,
+                model_version,
+            )
+        )
+
+    async def log_predictions(self, records: List[Dict[str, Any]]):
+        # Queue a batch of prediction results sharing one timestamp
+        timestamp = datetime.now(timezone.utc)
+        for record in records:
+            await self._enqueue(
+                (
+                    timestamp,
+                    record["request_id"],
+                    *record["features"],
+                    record["prediction"],
+                    record["status"],
+                    record.get("error"),
+                    record["processing_time"],
+                    record.get("model_version"),
+                )
+            )
+
+    async def _enqueue(self, row: tuple):
+        # Apply the overflow policy when the queue is full. The row is only offered to the
+        # recent predictions once it is queued, written or spilled, never when it is lost.
+        if self.queue is None or self._stopping:
+            # Not running (startup failure or shutdown), write through instead of losing the row
+            if await self._write([row]):
+                self._remember(row)
+            return
+
+        if not self.queue.full():
+            self.queue.put_nowait(row)
+        elif self.overflow_policy == "drop_oldest":
+            self._forget([self.queue.get_nowait()])
+            self.queue.put_nowait(row)
+            PREDICTION_LOG_DROPPED.labels(reason="overflow").inc()
+        elif self.overflow_policy == "spill":
+            # Wrapped so the callback runs on the event loop rather than the I/O thread
+            spilled = asyncio.wrap_future(self.executor_service.submit_io(self._spill, [row]))
+            spilled.add_done_callback(partial(self._remember_spilled, row))
+            return
+        else:
+            await self.queue.put(row)
+        self._remember(row)
+
+    def _remember(self, row: tuple):
+        if self.recent is not None:
+            self.recent.add(row)
+
+    def _remember_spilled(self, row: tuple, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            self._remember(row)
+
+    def _forget(self, rows: List[tuple]):
+        if self.recent is not None:
+            for row in rows:
+                self.recent.discard(row)
+
+    async def _run(self):
+        # Flush whenever the batch size or the flush interval is reached, and replay spilled
+        # rows every LOG_SPILL_REPLAY_INTERVAL seconds while the queue is drained
+        loop = asyncio.get_running_loop()
+        while not (self._stopping and self.queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+            if (
+                self.spill_replay_interval > 0
+                and not self._stopping
+                and self.queue.empty()
+                and loop.time() >= self._next_replay
+            ):
+                self._next_replay = loop.time() + self.spill_replay_interval
+                try:
+                    await self._replay_spilled()
+                except Exception as e:
+                    logger.error("Replay of spilled prediction log rows failed: %s", e)
+
+    async def _collect(self) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+        while len(batch) < self.flush_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if self._stopping or timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, rows: List[tuple]) -> bool:
+        # Write rows with COPY, falling back to a multi-row INSERT
+        started = time.perf_counter()
+        try:
+            try:
+                await self.db_service.copy_predictions(rows)
+                method = "copy"
+            except Exception as e:
+                logger.warning("COPY of %d log rows failed, retrying as INSERT: %s", len(rows), e)
+                await self.db_service.insert_predictions(rows)
+                method = "insert"
+        except Exception as e:
+            logger.error("Failed to write %d predictions to database: %s", len(rows), e)
+            if self.overflow_policy == "spill":
+                self.executor_service.submit_io(self._spill, rows)
+            else:
+                self._forget(rows)
+                PREDICTION_LOG_DROPPED.labels(reason="write_error").inc(len(rows))
+            return False
+
+        PREDICTION_LOG_FLUSH_LATENCY.labels(method=method).observe(time.perf_counter() - started)
+        PREDICTION_LOG_FLUSH_ROWS.observe(len(rows))
+        return True
+
+    def _spill_path(self) -> str:
+        return f"{self.spill_stem}.{os.getpid()}{self.spill_ext}"
+
+    def _spill(self, rows: List[tuple]) -> bool:
+        # Append rows to this process's spill file as JSON lines, replayed by _replay_spilled
+        lines = "".join(json.dumps([row[0].isoformat(), *row[1:]]) + "\n" for row in rows)
+        try:
+            with self._spill_lock:
+                with open(self._spill_path(), "a") as f:
+                    f.write(lines)
+            PREDICTION_LOG_SPILLED.inc(len(rows))
+            return True
+        except Exception as e:
+            logger.error("Failed to spill %d predictions to disk: %s", len(rows), e)
+            PREDICTION_LOG_DROPPED.labels(reason="spill_error").inc(len(rows))
+            return False
+
+    async def _replay_spilled(self):
+        # Write spilled rows back to the database in batches of LOG_FLUSH_SIZE. Rows that
+        # cannot be written yet go back to this process's spill file for the next attempt.
+        run_io = self.executor_service.run_io
+        for path in await run_io(self._claim_spilled):
+            offset = 0
+            while True:
+                rows, next_offset = await run_io(self._read_spilled, path, offset)
+                if not rows:
+                    break
+                try:
+                    try:
+                        await self.db_service.copy_predictions(rows)
+                    except Exception:
+                        await self.db_service.insert_predictions(rows)
+                except Exception as e:
+                    logger.warning("Spilled prediction log rows not replayed yet: %s", e)
+                    await run_io(self._respill, path, offset)
+                    return
+                PREDICTION_LOG_REPLAYED.inc(len(rows))
+                offset = next_offset
+            await run_io(os.remove, path)
+            logger.info("Replayed spilled prediction log rows from %s", path)
+
+    def _claim_spilled(self) -> List[str]:
+        # Take over the spill files of this process and of processes that are gone by renaming
+        # them to <file>.replay-<pid>, so no two processes replay the same file
+        pid = os.getpid()
+        claimed = []
+        pattern = f"{glob.escape(self.spill_stem)}*{glob.escape(self.spill_ext)}*"
+        for path in sorted(glob.glob(pattern)):
+            # The last number names the process writing or replaying the file
+            numbers = re.findall(r"\d+", path.removeprefix(self.spill_stem))
+            owner = int(numbers[-1]) if numbers else None
+            if owner is not None and owner != pid and _process_alive(owner):
+                continue
+            target = re.sub(r"\.replay-\d+$", "", path) + f".replay-{pid}"
+            try:
+                with self._spill_lock:
+                    os.replace(path, target)
+            except FileNotFoundError:
+                # Claimed by another process first
+                continue
+            claimed.append(target)
+        return claimed
+
+    def _read_spilled(self, path: str, offset: int) -> Tuple[List[tuple], int]:
+        # Up to LOG_FLUSH_SIZE rows from offset on, and the offset after them. Lines cut
+        # short by a crash are dropped.
+        rows = []
+        with open(path) as f:
+            f.seek(offset)
+            while len(rows) < self.flush_size:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    values = json.loads(line)
+                    if len(values) != len(LOG_COLUMNS):
+                        raise ValueError("unexpected number of columns")
+                    rows.append((datetime.fromisoformat(values[0]), *values[1:]))
+                except (ValueError, TypeError) as e:
+                    logger.warning("Skipping corrupt line in %s: %s", path, e)
+                    PREDICTION_LOG_DROPPED.labels(reason="spill_corrupt").inc()
+            return rows, f.tell()
+
+    def _respill(self, path: str, offset: int):
+        # Move the rows of a claimed file from offset on back to this process's spill file
+        with self._spill_lock:
+            with open(path) as source, open(self._spill_path(), "a") as target:
+                source.seek(offset)
+                shutil.copyfileobj(source, target)
+        os.remove(path)
+
+    async def stop(self):
+        # Drain queued rows to the database before shutdown
+        if self._task is None:
+            return
+        self._stopping = True
+        logger.info("Draining %d queued prediction log rows", self.queue.qsize())
+        try:
+            await asyncio.wait_for(self._task, timeout=self.config.log_drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Prediction log writer drain timed out, %d rows not written", self.queue.qsize()
+            )
+        finally:
+            self._task = None
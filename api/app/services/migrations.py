@@ -0,0 +1,155 @@
+import logging
+from datetime import datetime, timezone
+
+from app.config import Config
+from app.services.log_partitions import ensure_partition
+
+logger = logging.getLogger("diabetes-ml")
+
+# Serializes migrations across pods starting at the same time
+MIGRATION_LOCK_ID = 7_310_010
+
+FEATURE_COLUMNS = ", ".join(f"x{i}" for i in range(1, 11))
+
+
+async def _create_logs(conn, config: Config):
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS logs (
+            id SERIAL PRIMARY KEY,
+            timestamp TIMESTAMPTZ NOT NULL,
+            request_id VARCHAR(50),
+            x1 FLOAT, x2 FLOAT, x3 FLOAT, x4 FLOAT, x5 FLOAT,
+            x6 FLOAT, x7 FLOAT, x8 FLOAT, x9 FLOAT, x10 FLOAT,
+            prediction FLOAT,
+            status VARCHAR(20),
+            processing_time FLOAT
+        )
+    """
+    )
+
+
+async def _add_model_version(conn, config: Config):
+    await conn.execute("ALTER TABLE logs ADD COLUMN IF NOT EXISTS model_version VARCHAR(64)")
+
+
+async def _partition_logs(conn, config: Config):
+    # Rebuild logs as a table range-partitioned by timestamp, keeping ids of existing rows.
+    # Error messages move out of status (VARCHAR(20) overflowed) into their own column.
+    await conn.execute(
+        """
+        ALTER TABLE logs RENAME TO logs_unpartitioned;
+        ALTER INDEX IF EXISTS logs_pkey RENAME TO logs_unpartitioned_pkey;
+        ALTER SEQUENCE IF EXISTS logs_id_seq RENAME TO logs_unpartitioned_id_seq;
+
+        CREATE TABLE logs (
+            id BIGSERIAL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            request_id VARCHAR(50),
+            x1 FLOAT, x2 FLOAT, x3 FLOAT, x4 FLOAT, x5 FLOAT,
+            x6 FLOAT, x7 FLOAT, x8 FLOAT, x9 FLOAT, x10 FLOAT,
+            prediction FLOAT,
+            status VARCHAR(20),
+            error TEXT,
+            processing_time FLOAT,
+            model_version VARCHAR(64),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+
+        CREATE TABLE logs_default PARTITION OF logs DEFAULT;
+        CREATE INDEX logs_timestamp_id_idx ON logs (timestamp, id);
+        CREATE INDEX logs_request_id_idx ON logs (request_id);
+    """
+    )
+
+    # Partitions for the existing rows, so none of them land in the default partition
+    interval = config.log_partition_interval
+    rows = await conn.fetch(
+        f"SELECT DISTINCT date_trunc('{interval}', timestamp, 'UTC') AS start "
+        "FROM logs_unpartitioned"
+    )
+    for moment in [row["start"] for row in rows] or [datetime.now(timezone.utc)]:
+        await ensure_partition(conn, moment, interval)
+
+    await conn.execute(
+        f"""
+        INSERT INTO logs
+            (id, timestamp, request_id, {FEATURE_COLUMNS},
+             prediction, status, error, processing_time, model_version)
+        SELECT
+            id, timestamp, request_id, {FEATURE_COLUMNS}, prediction,
+            CASE WHEN status LIKE 'error%' THEN 'error' ELSE status END,
+            CASE WHEN status LIKE 'error: %' THEN substr(status, 8) END,
+            processing_time, model_version
+        FROM logs_unpartitioned;
+
+        SELECT setval(
+            pg_get_serial_sequence('logs', 'id'),
+            GREATEST((SELECT max(id) FROM logs_unpartitioned), 0) + 1,
+            false
+        );
+
+        DROP TABLE logs_unpartitioned;
+    """
+    )
+
+
+async def _create_rollups(conn, config: Config):
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS logs_hourly (
+            hour TIMESTAMPTZ NOT NULL,
+            model_version VARCHAR(64) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            request_count BIGINT NOT NULL,
+            prediction_avg FLOAT,
+            prediction_min FLOAT,
+            prediction_max FLOAT,
+            processing_time_avg FLOAT,
+            processing_time_p95 FLOAT,
+            processing_time_max FLOAT,
+            PRIMARY KEY (hour, model_version, status)
+        )
+    """
+    )
+
+
+# Applied in order, each one exactly once; never edit or reorder released entries
+MIGRATIONS = (
+    (1, "create logs table", _create_logs),
+    (2, "add logs.model_version", _add_model_version),
+    (3, "partition logs by timestamp", _partition_logs),
+    (4, "create logs_hourly rollups", _create_rollups),
+)
+
+
+async def apply_migrations(conn, config: Config) -> int:
+    # Bring the schema up to date, returning the number of migrations applied
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """
+    )
+
+    applied = 0
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_ID)
+        done = {row["version"] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+
+        for version, name, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            logger.info(f"Applying schema migration {version}: {name}")
+            async with conn.transaction():
+                await migrate(conn, config)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                    version,
+                    name,
+                )
+            applied += 1
+    return applied
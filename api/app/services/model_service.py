@@ -1,96 +1,331 @@
+import asyncio
+import hashlib
 import logging
 import os
 import pickle
-import tempfile
-from functools import lru_cache
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from typing import Optional, Tuple
 
-import boto3
 import numpy as np
-import tensorflow as tf
 from app.config import Config
+from app.services.artifact_store import ArtifactStore
+from app.services.batcher import InferenceBatcher
+from app.services.drift_monitor import DriftMonitor
+from app.services.numpy_engine import NumpyEngine
+from app.services.prediction_cache import PredictionCache
+from app.utils.startup import startup_timer
+from app.utils.tracing import record_stage, stage
 
 logger = logging.getLogger("diabetes-ml")
 
 
+class LoadedModel:
+    # One immutable model version; requests keep a reference for the whole forward pass
+    def __init__(self, version: str, model, scaler, engine: str):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.engine = engine
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        # Timed per forward pass; the NumPy engine has the scaling folded into its weights
+        if isinstance(self.model, NumpyEngine):
+            with stage("forward_pass", self.version):
+                return self.model.predict(features)
+
+        with stage("scale", self.version):
+            scaled = self.scaler.transform(features)
+        with stage("forward_pass", self.version):
+            predictions = self.model.predict(scaled, batch_size=len(scaled), verbose=0)
+        return predictions[:, 0].astype(np.float64)
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "engine": self.engine,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
 class ModelService:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, executor: Optional[Executor] = None):
         self.config = config
-        self.model = None
-        self.scaler = None
-        self.tempdir = tempfile.mkdtemp()
+        self.executor = executor
+        self.artifacts = ArtifactStore(config)
+        self.active: Optional[LoadedModel] = None
+        # Previously active versions, most recent first, kept loaded for instant rollback
+        self.history = deque(maxlen=config.model_history_size)
+        self.batcher = None
+        self.cache = None
+        self.drift = None
+        # Reloads run one at a time; the swap lock only guards the pointer swap, so a
+        # rollback on the event loop never waits for a model to load
+        self._reload_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._rolled_back = set()
+        # Cached blobs are addressed by their ETag, so the same paths always hold the same
+        # content and the version of a path pair is only hashed once
+        self._versions = {}
+        self._poll_task: Optional[asyncio.Task] = None
 
-        if self.config.use_iam_auth:
-            # Use IAM for S3 authentication
-            self.s3 = boto3.client("s3")
-        else:
-            # Use traditional credentials
-            self.s3 = boto3.client(
-                "s3",
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-                region_name=os.getenv("AWS_REGION"),
+        if self.config.prediction_cache:
+            self.cache = PredictionCache(
+                self.config.prediction_cache_size,
+                self.config.prediction_cache_ttl,
+                policy=self.config.prediction_cache_policy,
+                quantize_decimals=self.config.prediction_cache_quantize_decimals,
             )
 
+        if self.config.drift_monitor:
+            self.drift = DriftMonitor(
+                self.config.drift_bins,
+                self.config.drift_window,
+                self.config.drift_min_samples,
+            )
+
+        if self.config.inference_batching:
+            # Group concurrent single-row requests into shared forward passes
+            self.batcher = InferenceBatcher(
+                self.predict_batch,
+                self.config.inference_batch_max_size,
+                self.config.inference_batch_max_wait_ms,
+                executor=self.executor,
+            )
+
+    @property
+    def model(self):
+        return self.active.model if self.active else None
+
+    @property
+    def scaler(self):
+        return self.active.scaler if self.active else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.active.version if self.active else None
+
     def initialize(self) -> bool:
         # Model and scaler initialization
         try:
-            self._download_model()
-            model_path = os.path.join(self.tempdir, "model.h5")
-            self.model = tf.keras.models.load_model(model_path, compile=False)
+            with startup_timer.phase("download"):
+                paths = self.artifacts.sync()
 
-            scaler_path = os.path.join(self.tempdir, "scaler.pkl")
-            with open(scaler_path, "rb") as f:
-                self.scaler = pickle.load(f)
+            with startup_timer.phase("model_load"):
+                self.active = self._load(*self.resolve(paths))
 
-            logger.info("Model and scaler initialized successfully")
+            logger.info(
+                "Model and scaler initialized successfully (%s engine, version %s)",
+                self.active.engine,
+                self.active.version,
+            )
             return True
         except Exception as e:
-            logger.error(f"Error during model initialization: {str(e)}")
+            logger.error("Error during model initialization: %s", e)
             raise
 
-    def _download_model(self):
-        # Download model and scaler from S3
-        try:
+    def resolve(self, paths: dict) -> Tuple[str, str, str]:
+        # Pick the artifacts for the configured engine and derive their version
+        scaler_path = self._artifact_path(paths, "scaler.pkl")
+        if self.config.inference_engine == "numpy":
+            model_path = self._artifact_path(paths, "model_weights.npz")
+        else:
+            # model.h5 in the bucket layout, tf_model.h5 in a local trained_model/ dir
+            model_path = self._artifact_path(paths, "model.h5", "tf_model.h5")
+        version = self._versions.get((model_path, scaler_path))
+        if version is None:
+            version = self._fingerprint(model_path, scaler_path)
+            self._versions[(model_path, scaler_path)] = version
+        return version, model_path, scaler_path
+
+    def _load(self, version: str, model_path: str, scaler_path: str) -> LoadedModel:
+        # Load and warm one model version
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+
+        if self.config.inference_engine == "numpy" and self.config.model_shared_weights:
+            # Folded weights memory-mapped from the cache, shared by all worker processes
+            model = self._shared_engine(version, model_path, scaler)
+        elif self.config.inference_engine == "numpy":
+            # Scaler and BatchNorm are folded into the dense weights, no TensorFlow needed
+            model = NumpyEngine.from_file(model_path, scaler)
+        else:
+            # TensorFlow is only imported when the Keras engine is actually used
+            with startup_timer.phase("import"):
+                import tensorflow as tf
+
+            model = tf.keras.models.load_model(model_path, compile=False)
+
+        loaded = LoadedModel(version, model, scaler, self.config.inference_engine)
+        # Warm-up pass so the first real request does not pay for graph tracing
+        loaded.predict_batch(np.atleast_2d(scaler.mean_))
+        return loaded
+
+    def _shared_engine(self, version: str, model_path: str, scaler) -> NumpyEngine:
+        # The first process to load a version writes the packed file, the others only map it
+        path = os.path.join(self.config.model_cache_dir, "shared", f"{version}.npy")
+        if not os.path.exists(path):
+            NumpyEngine.from_file(model_path, scaler).save_packed(path)
+            logger.info("Packed folded weights of model version %s into %s", version, path)
+        return NumpyEngine.from_packed(path)
+
+    def prepare_shared_weights(self) -> str:
+        # Download and fold the current version once, before serving workers are started
+        version, model_path, scaler_path = self.resolve(self.artifacts.sync())
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+        self._shared_engine(version, model_path, scaler)
+        return version
+
+    def reload(self, force: bool = False) -> bool:
+        # Load a new version from the source in the background and swap it in atomically.
+        # Versions that were rolled back are only re-applied when forced.
+        with self._reload_lock:
+            version, model_path, scaler_path = self.resolve(self.artifacts.sync(force=True))
+            if self.active is not None and version == self.active.version:
+                return False
+            if version in self._rolled_back and not force:
+                return False
+
+            candidate = self._load(version, model_path, scaler_path)
+            with self._swap_lock:
+                previous = self.active
+                # In-flight requests hold their own reference to the previous version
+                self.active = candidate
+                if previous is not None:
+                    self.history.appendleft(previous)
+                self._rolled_back.discard(version)
             logger.info(
-                f"Downloading model from S3: {self.config.model_bucket}/{self.config.model_prefix}"
+                "Model version %s is now active (previous: %s)",
+                version,
+                previous.version if previous else "none",
             )
-            paginator = self.s3.get_paginator("list_objects_v2")
-
-            found_any = False
-            for page in paginator.paginate(
-                Bucket=self.config.model_bucket, Prefix=self.config.model_prefix
-            ):
-                for obj in page.get("Contents", []):
-                    found_any = True
-                    key = obj["Key"]
-                    target = os.path.join(
-                        self.tempdir, key.replace(self.config.model_prefix + "/", "")
-                    )
-                    os.makedirs(os.path.dirname(target), exist_ok=True)
-                    self.s3.download_file(self.config.model_bucket, key, target)
-                    logger.debug(f"Downloaded {key} -> {target}")
-            if not found_any:
-                raise FileNotFoundError("No model files found in S3 under the given prefix.")
-        except Exception as e:
-            logger.error(f"Error during downloading model from S3: {str(e)}")
-            raise
+            return True
 
-    @lru_cache(maxsize=128)
-    def predict(self, feature_tuple: tuple) -> float:
-        # Making prediction with cache
-        if not self.model or not self.scaler:
-            raise ValueError("Model is not initialized")
+    def rollback(self, version: Optional[str] = None) -> str:
+        # Swap a previously loaded version back in, the most recent one by default
+        with self._swap_lock:
+            if not self.history:
+                raise LookupError("No previous model version to roll back to")
 
-        features = np.array([feature_tuple])
-        scaled = self.scaler.transform(features)
-        return float(self.model.predict(scaled)[0][0])
+            if version is None:
+                target = self.history[0]
+            else:
+                target = next((m for m in self.history if m.version == version), None)
+                if target is None:
+                    raise LookupError(f"Model version {version} is not loaded")
 
-    def cleanup(self):
-        # Cleaning resources
-        if os.path.exists(self.tempdir):
-            import shutil
+            self.history.remove(target)
+            self.history.appendleft(self.active)
+            # Keep the poller from re-applying the version that was just rolled back
+            self._rolled_back.add(self.active.version)
+            self.active = target
+            logger.warning("Rolled back to model version %s", target.version)
+            return target.version
+
+    def versions(self) -> dict:
+        return {
+            "active": self.active.describe() if self.active else None,
+            "history": [loaded.describe() for loaded in self.history],
+        }
+
+    def start_polling(self):
+        # Periodically check the model source for a new version
+        if self.config.model_poll_interval > 0 and self._poll_task is None:
+            self._poll_task = asyncio.get_running_loop().create_task(self._poll())
 
+    async def _poll(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.config.model_poll_interval)
             try:
-                shutil.rmtree(self.tempdir)
+                # Loading is blocking, keep it off the event loop and the inference pool
+                await loop.run_in_executor(None, self.reload)
             except Exception as e:
-                logger.warning(f"Could not clean temporary directory: {str(e)}")
+                logger.error("Model reload failed, keeping version %s: %s", self.model_version, e)
+
+    @staticmethod
+    def _artifact_path(paths: dict, *names: str) -> str:
+        # Return the local path of the first artifact name present in the source
+        for name in names:
+            if name in paths:
+                return paths[name]
+        raise FileNotFoundError(f"Model artifact not found: {' or '.join(names)}")
+
+    @staticmethod
+    def _fingerprint(*paths: str) -> str:
+        # Short content hash of the loaded artifacts, used as the model version
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:12]
+
+    def predict(self, feature_tuple: tuple) -> Tuple[float, str]:
+        # Making prediction for a single row
+        predictions, version = self.predict_batch(np.array([feature_tuple]))
+        return float(predictions[0]), version
+
+    async def predict_async(self, feature_tuple: tuple) -> Tuple[float, str]:
+        # Making prediction with cache, identical concurrent requests share one computation
+        self._observe(feature_tuple)
+        if self.cache is None:
+            return await self._predict_uncached(feature_tuple)
+
+        started = time.perf_counter()
+        computed = False
+
+        async def compute():
+            nonlocal computed
+            computed = True
+            record_stage("cache_lookup", time.perf_counter() - started)
+            return await self._predict_uncached(feature_tuple)
+
+        key = self.cache.make_key(self.model_version, feature_tuple)
+        result = await self.cache.get_or_compute(key, compute)
+        if not computed:
+            # Cache hit, or waiting on an identical in-flight request
+            record_stage("cache_lookup", time.perf_counter() - started)
+        return result
+
+    async def _predict_uncached(self, feature_tuple: tuple) -> Tuple[float, str]:
+        # Making prediction through the micro-batching scheduler when enabled
+        with stage("inference"):
+            return await self._predict_direct(feature_tuple)
+
+    async def _predict_direct(self, feature_tuple: tuple) -> Tuple[float, str]:
+        if self.batcher is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.predict, feature_tuple)
+        return await self.batcher.submit(feature_tuple)
+
+    async def predict_batch_async(self, features: np.ndarray) -> Tuple[np.ndarray, str]:
+        # Run a vectorized forward pass on the inference executor, bypassing the cache
+        self._observe(features)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.predict_batch, features)
+
+    def _observe(self, features):
+        # Feed incoming traffic (cache hits included) to the drift monitor
+        active = self.active
+        if self.drift is not None and active is not None:
+            self.drift.observe(features, active.scaler)
+
+    def predict_batch(self, features: np.ndarray) -> Tuple[np.ndarray, str]:
+        # Run the whole feature matrix through the active version in one forward pass
+        active = self.active
+        if active is None:
+            raise ValueError("Model is not initialized")
+        return active.predict_batch(features), active.version
+
+    def cleanup(self):
+        # Cleaning resources, the artifact cache is kept for the next start
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self.batcher is not None:
+            self.batcher.stop()
@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+def load_layers(path: str) -> List[dict]:
+    # Read the layer spec and arrays written by export_weights.py
+    with np.load(path, allow_pickle=False) as archive:
+        spec = json.loads(str(archive["spec"]))
+        layers = []
+        for i, layer in enumerate(spec):
+            prefix = f"layer{i}_"
+            arrays = {
+                name.removeprefix(prefix): archive[name].astype(np.float64)
+                for name in archive.files
+                if name.startswith(prefix)
+            }
+            layers.append({**layer, **arrays})
+    return layers
+
+
+# Dense/BatchNorm MLP forward pass in plain NumPy. The scaler and every
+# BatchNormalization layer are folded into the neighbouring dense weights
+# at load time, so inference is one matmul and activation per dense layer.
+class NumpyEngine:
+    def __init__(
+        self,
+        dense_layers: List[Tuple[np.ndarray, np.ndarray, str]],
+        output_affine: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ):
+        self.dense_layers = dense_layers
+        self.output_affine = output_affine
+
+    @classmethod
+    def from_file(cls, path: str, scaler=None) -> "NumpyEngine":
+        # Build the engine from an exported weights file, folding in the scaler if given
+        return cls.from_layers(load_layers(path), scaler)
+
+    @classmethod
+    def from_layers(cls, layers: List[dict], scaler=None) -> "NumpyEngine":
+        # Fold the input scaler and BatchNorm statistics into the dense weights
+        dense_layers = []
+        pending = None  # Affine (a, c) applied to the input of the next dense layer
+
+        if scaler is not None:
+            n_features = scaler.n_features_in_
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+            pending = (1.0 / scale, -mean / scale)
+
+        for layer in layers:
+            kind = layer["type"]
+            if kind == "dense":
+                activation = layer["activation"]
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation: {activation}")
+                kernel = layer["kernel"]
+                bias = layer.get("bias", np.zeros(kernel.shape[1]))
+                if pending is not None:
+                    a, c = pending
+                    bias = bias + c @ kernel
+                    kernel = a[:, None] * kernel
+                    pending = None
+                dense_layers.append((kernel, bias, activation))
+            elif kind == "batch_norm":
+                width = layer["moving_mean"].shape[0]
+                gamma = layer.get("gamma", np.ones(width))
+                beta = layer.get("beta", np.zeros(width))
+                a = gamma / np.sqrt(layer["moving_variance"] + layer["epsilon"])
+                c = beta - layer["moving_mean"] * a
+                if pending is None and dense_layers and dense_layers[-1][2] == "linear":
+                    # BatchNorm right after a linear dense folds backwards into it
+                    kernel, bias, activation = dense_layers[-1]
+                    dense_layers[-1] = (kernel * a, bias * a + c, activation)
+                elif pending is None:
+                    pending = (a, c)
+                else:
+                    pending = (a * pending[0], a * pending[1] + c)
+            elif kind != "dropout":
+                raise ValueError(f"Unsupported layer type: {kind}")
+
+        return cls(dense_layers, output_affine=pending)
+
+    def save_packed(self, path: str):
+        # Write the folded weights as one flat float64 .npy array plus a JSON layout file,
+        # so worker processes can map them read-only instead of each holding a copy.
+        # The .npy is replaced last, its presence means the pair is complete.
+        arrays, layout = [], {"dense_layers": [], "output_affine": None}
+        offset = 0
+
+        def place(array):
+            nonlocal offset
+            arrays.append(np.ascontiguousarray(array, dtype=np.float64).ravel())
+            slot = [offset, list(array.shape)]
+            offset += array.size
+            return slot
+
+        for kernel, bias, activation in self.dense_layers:
+            layout["dense_layers"].append([place(kernel), place(bias), activation])
+        if self.output_affine is not None:
+            layout["output_affine"] = [place(np.asarray(a)) for a in self.output_affine]
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        for target, write in (
+            (f"{path}.json", lambda f: f.write(json.dumps(layout).encode())),
+            (path, lambda f: np.save(f, np.concatenate(arrays))),
+        ):
+            fd, partial = tempfile.mkstemp(dir=directory, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    write(f)
+                os.replace(partial, target)
+            except Exception:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+
+    @classmethod
+    def from_packed(cls, path: str) -> "NumpyEngine":
+        # Map a file written by save_packed; the arrays are read-only views into the page
+        # cache, shared by every process that maps the same file
+        with open(f"{path}.json") as f:
+            layout = json.load(f)
+        buffer = np.asarray(np.load(path, mmap_mode="r"))
+
+        def view(slot):
+            start, shape = slot
+            stop = start + int(np.prod(shape))
+            return buffer[start:stop].reshape(shape)
+
+        dense_layers = [
+            (view(kernel), view(bias), activation)
+            for kernel, bias, activation in layout["dense_layers"]
+        ]
+        output_affine = layout["output_affine"]
+        if output_affine is not None:
+            output_affine = tuple(view(slot) for slot in output_affine)
+        return cls(dense_layers, output_affine=output_affine)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        # Run the forward pass on raw (unscaled) features, one prediction per row
+        x = np.asarray(features, dtype=np.float64)
+        for kernel, bias, activation in self.dense_layers:
+            x = ACTIVATIONS[activation](x @ kernel + bias)
+        if self.output_affine is not None:
+            x = x * self.output_affine[0] + self.output_affine[1]
+        return x[:, 0]
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+from app.utils.metrics import (
+    PREDICTION_CACHE_COALESCED,
+    PREDICTION_CACHE_EVICTIONS,
+    PREDICTION_CACHE_HITS,
+    PREDICTION_CACHE_MISSES,
+    PREDICTION_CACHE_SIZE,
+)
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class PredictionCache:
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        policy: str = "lru",
+        quantize_decimals: Optional[int] = None,
+    ):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unsupported cache eviction policy: {policy}")
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.policy = policy
+        self.quantize_decimals = quantize_decimals
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight = {}
+        PREDICTION_CACHE_SIZE.set_function(lambda: len(self._entries))
+
+    def make_key(self, model_version: str, feature_tuple: tuple) -> Hashable:
+        # Key on the model version so a model change never serves stale results
+        if self.quantize_decimals is not None:
+            feature_tuple = tuple(round(v, self.quantize_decimals) for v in feature_tuple)
+        return (model_version, feature_tuple)
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        # Return a cached value, or compute it once for all concurrent identical requests
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.monotonic() < expires_at:
+                if self.policy == "lru":
+                    self._entries.move_to_end(key)
+                PREDICTION_CACHE_HITS.inc()
+                return value
+            del self._entries[key]
+            PREDICTION_CACHE_EVICTIONS.labels(reason="expired").inc()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            PREDICTION_CACHE_COALESCED.inc()
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leading request was cancelled before it finished: compute the value
+                # here instead, unless this request is the one being cancelled
+                if not inflight.cancelled():
+                    raise
+                return await self.get_or_compute(key, compute)
+
+        PREDICTION_CACHE_MISSES.inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            # Wake the waiting requests, they retry on their own
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when no other request was waiting on it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            PREDICTION_CACHE_EVICTIONS.labels(reason="capacity").inc()
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.config import Config
+from app.services.db_service import LOG_COLUMNS, DatabaseService
+from app.utils.metrics import (
+    PREDICTION_HISTORY_ROWS,
+    PREDICTION_LOOKUPS,
+    RECENT_PREDICTIONS_SIZE,
+)
+
+# Position of the request ID in rows in LOG_COLUMNS order
+REQUEST_ID_INDEX = LOG_COLUMNS.index("request_id")
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    # Opaque position of a row in the (timestamp, id) order
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, _, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _finite(value: Optional[float]) -> Optional[float]:
+    return value if value is not None and math.isfinite(value) else None
+
+
+def to_item(row) -> dict:
+    # A log row (tuple in LOG_COLUMNS order or database record) as a JSON-safe response item;
+    # NaN and infinite values (rejected /predict/binary rows) become null
+    values = dict(zip(LOG_COLUMNS, row)) if isinstance(row, tuple) else dict(row)
+    return {
+        "request_id": values["request_id"],
+        "timestamp": values["timestamp"].isoformat(),
+        "features": [_finite(values[f"x{i}"]) for i in range(1, 11)],
+        "prediction": _finite(values["prediction"]),
+        "status": values["status"],
+        "error": values["error"],
+        "processing_time": values["processing_time"],
+        "model_version": values["model_version"],
+    }
+
+
+class RecentPredictions:
+    # Log rows of the most recently created request IDs, added by the log writer once the row
+    # is queued, written or spilled. Lookups right after a prediction are answered without a
+    # database round trip, even before the row is flushed. Rows arrive in creation order, so
+    # the oldest go first.
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._rows: "OrderedDict[str, Tuple[tuple, float]]" = OrderedDict()
+        RECENT_PREDICTIONS_SIZE.set_function(lambda: len(self._rows))
+
+    def add(self, row: tuple):
+        if self.max_size <= 0:
+            return
+        request_id = row[REQUEST_ID_INDEX]
+        self._rows[request_id] = (row, time.monotonic() + self.ttl)
+        self._rows.move_to_end(request_id)
+        while len(self._rows) > self.max_size:
+            self._rows.popitem(last=False)
+
+    def discard(self, row: tuple):
+        # Forget a row the log writer dropped, it will never reach the database
+        self._rows.pop(row[REQUEST_ID_INDEX], None)
+
+    def get(self, request_id: str) -> Optional[tuple]:
+        entry = self._rows.get(request_id)
+        if entry is None:
+            return None
+        row, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._rows[request_id]
+            return None
+        return row
+
+
+class PredictionHistory:
+    # Read-back of logged predictions: single request IDs from the hot rows or the request_id
+    # index, time ranges as keyset pages over (timestamp, id)
+    def __init__(self, config: Config, db_service: DatabaseService, recent: RecentPredictions):
+        self.config = config
+        self.db_service = db_service
+        self.recent = recent
+        self.page_size = max(1, config.prediction_history_page_size)
+
+    async def get(self, request_id: str) -> Optional[dict]:
+        row = self.recent.get(request_id)
+        if row is not None:
+            PREDICTION_LOOKUPS.labels(source="cache").inc()
+            return to_item(row)
+        record = await self.db_service.fetch_prediction(request_id)
+        PREDICTION_LOOKUPS.labels(source="database" if record is not None else "missing").inc()
+        return to_item(record) if record is not None else None
+
+    async def page(
+        self,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+        status: Optional[str] = None,
+    ) -> dict:
+        # One page and the cursor of the next one (None on the last page)
+        after = decode_cursor(cursor) if cursor else None
+        records = await self.db_service.fetch_prediction_page(
+            start, end, limit, after=after, descending=descending, status=status
+        )
+        PREDICTION_HISTORY_ROWS.labels(format="json").inc(len(records))
+        next_cursor = None
+        if len(records) == limit:
+            next_cursor = encode_cursor(records[-1]["timestamp"], records[-1]["id"])
+        return {"items": [to_item(record) for record in records], "next_cursor": next_cursor}
+
+    async def stream(
+        self,
+        start: datetime,
+        end: datetime,
+        cursor: Optional[str] = None,
+        descending: bool = False,
+        status: Optional[str] = None,
+    ) -> AsyncIterator[List[dict]]:
+        # Every row of the range, one page at a time. Each page takes a pooled connection only
+        # for its own query, so a long download never holds one for its whole duration.
+        after = decode_cursor(cursor) if cursor else None
+        while True:
+            records = await self.db_service.fetch_prediction_page(
+                start, end, self.page_size, after=after, descending=descending, status=status
+            )
+            if records:
+                PREDICTION_HISTORY_ROWS.labels(format="ndjson").inc(len(records))
+                yield [to_item(record) for record in records]
+            if len(records) < self.page_size:
+                return
+            after = (records[-1]["timestamp"], records[-1]["id"])
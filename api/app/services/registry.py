@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import Config
+from app.services.admission import AdmissionController
+from app.services.db_service import DatabaseService
+from app.services.executor_service import ExecutorService
+from app.services.health_monitor import HealthMonitor
+from app.services.log_maintenance import LogMaintenance
+from app.services.log_writer import PredictionLogWriter
+from app.services.model_service import ModelService
+from app.services.prediction_history import PredictionHistory, RecentPredictions
+from app.services.stats_service import StatsService
+from app.utils.loop_monitor import EventLoopMonitor
+from app.utils.profiler import StackSampler
+from app.utils.startup import startup_timer
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class ServiceRegistry:
+    def __init__(self, config: Config, db_service: Optional[DatabaseService] = None):
+        # Every service that talks to the database shares db_service, which can be replaced
+        # (e.g. by the in-memory stand-in of benchmark.py)
+        self.config = config
+        self.executor_service = ExecutorService(config)
+        self.model_service = ModelService(config, executor=self.executor_service.inference)
+        self.db_service = db_service or DatabaseService(config)
+        self.recent_predictions = RecentPredictions(
+            config.recent_predictions_size, config.recent_predictions_ttl
+        )
+        self.log_writer = PredictionLogWriter(
+            config, self.db_service, self.executor_service, self.recent_predictions
+        )
+        self.prediction_history = PredictionHistory(
+            config, self.db_service, self.recent_predictions
+        )
+        self.log_maintenance = LogMaintenance(config, self.db_service)
+        self.stats_service = StatsService(config)
+        self.admission = AdmissionController(config)
+        self.health_monitor = HealthMonitor(config, self.model_service, self.db_service)
+        self.loop_monitor = EventLoopMonitor(config.event_loop_lag_interval)
+        self.profiler = StackSampler(config.profiler_interval_ms)
+
+    async def initialize(self):
+        # Initialize every service exactly once; the model loads while the DB pool connects
+        with startup_timer.phase("total"):
+            await asyncio.gather(
+                self.executor_service.run_io(self.model_service.initialize),
+                self._initialize_db(),
+            )
+            self.loop_monitor.start()
+            if self.config.profiler_enabled:
+                self.profiler.start()
+            self.log_writer.start()
+            self.log_maintenance.start()
+            self.model_service.start_polling()
+            # The first status is ready before traffic arrives, then refreshed in the background
+            await self.health_monitor.refresh()
+            self.health_monitor.start()
+        startup_timer.report()
+
+    async def _initialize_db(self):
+        with startup_timer.phase("db_pool"):
+            await self.db_service.initialize()
+        # Partitions for today and the next days must exist before the first rows arrive
+        try:
+            await self.log_maintenance.run_once()
+        except Exception as e:
+            logger.error(f"Initial log table maintenance failed: {str(e)}")
+
+    async def shutdown(self):
+        # Release resources in reverse dependency order, flushing queued log rows first
+        self.loop_monitor.stop()
+        self.health_monitor.stop()
+        self.profiler.stop()
+        self.log_maintenance.stop()
+        await self.log_writer.stop()
+        await self.db_service.close()
+        self.model_service.cleanup()
+        self.executor_service.cleanup()
@@ -0,0 +1,86 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from app.config import Config
+from app.utils.sketches import QuantileSketch, SlidingWindowCounter, parse_count
+
+# Throughput windows reported by /stats, in seconds
+THROUGHPUT_WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+class StatsService:
+    # Streaming aggregates of the predictions served by this process. Updates run on the
+    # event loop and cost O(1); reads do not depend on how many predictions were served.
+    def __init__(self, config: Config):
+        self.config = config
+        self.started_at = datetime.now(timezone.utc)
+        self.processing_time = QuantileSketch(config.stats_sketch_accuracy)
+        self.prediction = QuantileSketch(config.stats_sketch_accuracy)
+        self.status_counts = Counter()
+        self.throughput = SlidingWindowCounter(max(THROUGHPUT_WINDOWS.values()))
+
+    def record(self, processing_time: float, status: str, prediction: Optional[float] = None):
+        # Record one served prediction; failed ones carry no prediction value
+        self.status_counts[status] += 1
+        self.processing_time.add(processing_time)
+        if prediction is not None:
+            self.prediction.add(prediction)
+        self.throughput.add()
+
+    def record_many(self, processing_time: float, statuses: Iterable[str], predictions):
+        # Record a batch that shares one processing time
+        statuses = list(statuses)
+        self.status_counts.update(statuses)
+        self.processing_time.add_many([processing_time] * len(statuses))
+        self.prediction.add_many(predictions)
+        self.throughput.add(len(statuses))
+
+    def summary(self) -> dict:
+        now = time.time()
+        return {
+            "since": self.started_at.isoformat(),
+            "processing_time": self.processing_time.summary(),
+            "prediction": self.prediction.summary(),
+            "status_counts": dict(self.status_counts),
+            "throughput": {
+                name: round(self.throughput.rate(window, now), 3)
+                for name, window in THROUGHPUT_WINDOWS.items()
+            },
+        }
+
+    def to_dict(self) -> dict:
+        # Raw mergeable state, e.g. for combining the stats of several pods
+        return {
+            "since": self.started_at.isoformat(),
+            "processing_time": self.processing_time.to_dict(),
+            "prediction": self.prediction.to_dict(),
+            "status_counts": dict(self.status_counts),
+            "throughput": self.throughput.to_dict(),
+        }
+
+    def merge(self, state: dict):
+        # Fold the raw state exported by another process into this one. The whole state is
+        # parsed first, so a malformed one raises ValueError and changes nothing.
+        try:
+            since = datetime.fromisoformat(state["since"])
+            processing_time = QuantileSketch.from_dict(state["processing_time"])
+            prediction = QuantileSketch.from_dict(state["prediction"])
+            throughput = SlidingWindowCounter.from_dict(
+                state["throughput"], max_horizon=self.throughput.horizon
+            )
+            status_counts = state["status_counts"]
+            if not isinstance(status_counts, dict):
+                raise ValueError("status_counts must be an object")
+            status_counts = {str(key): parse_count(count) for key, count in status_counts.items()}
+        except (KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f"Malformed stats state: {e!r}")
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
+        self.started_at = min(self.started_at, since)
+        self.processing_time.merge(processing_time)
+        self.prediction.merge(prediction)
+        self.status_counts.update(status_counts)
+        self.throughput.merge(throughput)
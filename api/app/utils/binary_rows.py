@@ -0,0 +1,59 @@
+import struct
+from typing import Tuple
+
+import numpy as np
+from app.utils.features import FEATURE_NAMES
+
+BINARY_CONTENT_TYPE = "application/octet-stream"
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# 8-byte header: row count (uint32), bytes per value (4 = float32, 8 = float64), 3 pad bytes
+HEADER = struct.Struct("<IB3x")
+DTYPES = {4: np.dtype("<f4"), 8: np.dtype("<f8")}
+
+
+def decode_rows(body: bytes) -> Tuple[np.ndarray, np.dtype]:
+    # Header followed by row-major little-endian features x1..x10, read without copying
+    if len(body) < HEADER.size:
+        raise ValueError(f"Body is shorter than the {HEADER.size}-byte header")
+    rows, width = HEADER.unpack_from(body)
+    dtype = DTYPES.get(width)
+    if dtype is None:
+        raise ValueError(f"Unsupported value width {width}, expected 4 or 8")
+    expected = HEADER.size + rows * len(FEATURE_NAMES) * dtype.itemsize
+    if len(body) != expected:
+        raise ValueError(f"Body has {len(body)} bytes, header announces {expected}")
+    matrix = np.frombuffer(body, dtype=dtype, offset=HEADER.size)
+    return matrix.reshape(rows, len(FEATURE_NAMES)), dtype
+
+
+def encode_predictions(predictions: np.ndarray, dtype: np.dtype) -> bytes:
+    # Same header layout, followed by one prediction per row (NaN for rejected rows)
+    return HEADER.pack(len(predictions), dtype.itemsize) + predictions.astype(dtype).tobytes()
+
+
+def decode_msgpack_rows(body: bytes) -> np.ndarray:
+    # An array of rows, each an array of the 10 features, or {"rows": [...]}
+    import msgpack
+
+    try:
+        payload = msgpack.unpackb(body)
+    except Exception:
+        raise ValueError("Body is not valid msgpack")
+    if isinstance(payload, dict):
+        payload = payload.get("rows")
+    try:
+        matrix = np.asarray(payload, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("Rows must be arrays of 10 numbers")
+    if matrix.size == 0:
+        matrix = matrix.reshape(0, len(FEATURE_NAMES))
+    if matrix.ndim != 2 or matrix.shape[1] != len(FEATURE_NAMES):
+        raise ValueError("Rows must be arrays of 10 numbers")
+    return matrix
+
+
+def encode_msgpack(payload: dict) -> bytes:
+    import msgpack
+
+    return msgpack.packb(payload, use_bin_type=True)
@@ -0,0 +1,38 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Feature names in the order expected by the scaler and the model
+FEATURE_NAMES = tuple(f"x{i}" for i in range(1, 11))
+
+
+def rows_to_matrix(rows: Sequence[Any]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    # Build a feature matrix from raw rows, collecting a validation error per row
+    matrix = np.full((len(rows), len(FEATURE_NAMES)), np.nan)
+    errors: List[Optional[str]] = [None] * len(rows)
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[i] = "Each row must be an object with features x1..x10."
+            continue
+        missing = [name for name in FEATURE_NAMES if name not in row]
+        if missing:
+            errors[i] = f"Missing input features: {', '.join(missing)}"
+            continue
+        values = [row[name] for name in FEATURE_NAMES]
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            errors[i] = "All input features must be numeric (float or int)."
+            continue
+        try:
+            matrix[i] = values
+        except OverflowError:
+            # JSON integers too large for float64
+            errors[i] = "Input features must be within the float64 range."
+
+    # Finiteness is checked for the whole matrix at once
+    not_finite = ~np.isfinite(matrix).all(axis=1)
+    for i in np.flatnonzero(not_finite):
+        if errors[i] is None:
+            errors[i] = "Input features cannot be NaN or infinite."
+
+    return matrix, errors
@@ -1,29 +1,206 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+import sys
+import threading
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler
 
-import boto3
-import watchtower
+from app.utils.metrics import APP_LOG_QUEUE_DEPTH, APP_LOG_RECORDS_DROPPED
+from app.utils.tracing import TraceContextFilter
+
+TEXT_FORMAT = (
+    "%(asctime)s - %(name)s - %(levelname)s - "
+    "[trace=%(trace_id)s request=%(request_id)s] %(message)s"
+)
+# Records of the AWS SDK are not shipped to CloudWatch, uploading them would log again
+CLOUDWATCH_EXCLUDED = ("botocore", "boto3", "urllib3", "watchtower")
+
+# Put on the queue by BatchingListener.stop to end the listener thread
+_STOP = object()
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line, with the request context added by TraceContextFilter
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+            "request_id": getattr(record, "request_id", "-"),
+            "model_version": getattr(record, "model_version", "-"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    # Under high volume, keep the first `burst` records per second of each message template
+    # and a `rate` fraction of the rest. Warnings and errors always pass. Templates are only
+    # recognizable with lazy %-style arguments, f-strings make every message unique.
+    def __init__(self, burst: int, rate: float):
+        super().__init__()
+        self.burst = burst
+        self.rate = rate
+        self._second = 0
+        self._counts = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= logging.WARNING:
+            return True
+        second = int(record.created)
+        if second != self._second:
+            self._second = second
+            self._counts = {}
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0) + 1
+        self._counts[key] = count
+        if count <= self.burst or random.random() < self.rate:
+            return True
+        APP_LOG_RECORDS_DROPPED.labels(reason="sampled").inc()
+        return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    # The logging call only enqueues; when the queue is full the record is dropped and
+    # counted instead of blocking the request
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, the listener formats the record later on another thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            APP_LOG_RECORDS_DROPPED.labels(reason="overflow").inc()
+
+
+class BatchingListener:
+    # Background thread that drains the queue in batches: one write and flush per batch
+    # to the stream, and every record handed to the extra handlers (CloudWatch batches
+    # its own uploads)
+    def __init__(self, log_queue: queue.Queue, stream, formatter, handlers, batch_size: int):
+        self.queue = log_queue
+        self.stream = stream
+        self.formatter = formatter
+        self.handlers = handlers
+        self.batch_size = max(1, batch_size)
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not _STOP]
+            self._emit(records)
+            if len(records) != len(batch):
+                return
+
+    def _emit(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception as e:
+                lines.append(f"Failed to format log record from {record.name}: {e}")
+        try:
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+        except Exception:
+            pass
+        for handler in self.handlers:
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def stop(self, timeout: float = 5.0):
+        # Flush queued records at exit, waiting at most `timeout` seconds
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        for handler in self.handlers:
+            handler.close()
 
 
 def setup_logging(config):
-    # Primary log configuration
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    )
+    # Primary log configuration: every logger writes to a bounded in-memory queue and a
+    # background listener formats and ships the records
+    root = logging.getLogger()
     logger = logging.getLogger("diabetes-ml")
+    if any(isinstance(handler, BoundedQueueHandler) for handler in root.handlers):
+        return logger
 
-    # Add optional Cloudwatch as log handler
+    if config.app_log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    log_queue = queue.Queue(maxsize=config.app_log_queue_size)
+    queue_handler = BoundedQueueHandler(log_queue)
+    # Sampling runs first, so dropped records never pay for the context lookup
+    queue_handler.addFilter(SamplingFilter(config.app_log_sample_burst, config.app_log_sample_rate))
+    # Handler-level, so records of every logger carry the IDs the formats refer to
+    queue_handler.addFilter(TraceContextFilter())
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.app_log_level)
+    APP_LOG_QUEUE_DEPTH.set_function(log_queue.qsize)
+
+    # Add optional Cloudwatch as log handler, fed by the listener thread
+    handlers = []
+    cloudwatch_error = None
     if config.enable_cloudwatch:
         try:
+            # Imported only when CloudWatch is enabled to keep boto3 off the startup path
+            import boto3
+            import watchtower
+
             cloudwatch_handler = watchtower.CloudWatchLogHandler(
                 log_group=config.cloudwatch_log_group,
                 stream_name=datetime.now(timezone.utc).strftime("%Y-%m-%d-%H-%M-%S"),
                 boto3_session=boto3.Session(),
             )
-            logger.addHandler(cloudwatch_handler)
-            logger.info("CloudWatch logging enabled")
+            cloudwatch_handler.setFormatter(formatter)
+            cloudwatch_handler.addFilter(
+                lambda record: not record.name.startswith(CLOUDWATCH_EXCLUDED)
+            )
+            handlers.append(cloudwatch_handler)
         except Exception as e:
-            logger.warning(f"Failed to initialize CloudWatch logging: {e}")
+            cloudwatch_error = e
+
+    listener = BatchingListener(
+        log_queue, sys.stdout, formatter, handlers, config.app_log_batch_size
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
+    if cloudwatch_error is not None:
+        logger.warning("Failed to initialize CloudWatch logging: %s", cloudwatch_error)
+    elif handlers:
+        logger.info("CloudWatch logging enabled")
     return logger
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.utils.metrics import EVENT_LOOP_LAG, EVENT_LOOP_LAG_LAST
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class EventLoopMonitor:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        # Start sampling lag on the running event loop
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        # Lag is how much later than requested a sleep wakes up
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            EVENT_LOOP_LAG.observe(lag)
+            EVENT_LOOP_LAG_LAST.set(lag)
+            if lag > 0.1:
+                logger.warning("Event loop lag of %.1f ms detected", lag * 1000)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
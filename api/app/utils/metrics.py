@@ -0,0 +1,178 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Micro-batching scheduler metrics
+INFERENCE_BATCH_SIZE = Histogram(
+    "inference_batch_size",
+    "Number of requests grouped into a single forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+INFERENCE_QUEUE_WAIT = Histogram(
+    "inference_queue_wait_seconds",
+    "Time a request waited in the inference queue before its batch ran",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Event loop health
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the event loop should have woken up and when it did",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+EVENT_LOOP_LAG_LAST = Gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
+
+# Buffered prediction-log writer
+PREDICTION_LOG_QUEUE_DEPTH = Gauge(
+    "prediction_log_queue_depth", "Prediction log rows waiting to be written"
+)
+PREDICTION_LOG_FLUSH_LATENCY = Histogram(
+    "prediction_log_flush_seconds",
+    "Time to write one batch of prediction log rows",
+    ["method"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PREDICTION_LOG_FLUSH_ROWS = Histogram(
+    "prediction_log_flush_rows",
+    "Number of prediction log rows written per flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+PREDICTION_LOG_DROPPED = Counter(
+    "prediction_log_dropped_total", "Prediction log rows that were not written", ["reason"]
+)
+PREDICTION_LOG_SPILLED = Counter(
+    "prediction_log_spilled_total", "Prediction log rows written to the local spill file"
+)
+PREDICTION_LOG_REPLAYED = Counter(
+    "prediction_log_replayed_total", "Spilled prediction log rows written to the database"
+)
+LOG_MAINTENANCE_SECONDS = Histogram(
+    "log_maintenance_seconds", "Duration of logs table maintenance steps", ["step"]
+)
+LOG_DEFAULT_PARTITION_ROWS = Gauge(
+    "log_default_partition_rows", "Rows in the logs default partition after maintenance"
+)
+
+# Database connection pool
+DB_POOL_ACQUIRE_WAIT = Histogram(
+    "db_pool_acquire_wait_seconds",
+    "Time spent waiting to check out a pooled database connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_POOL_CHECKOUT_FAILURES = Counter(
+    "db_pool_checkout_failures_total",
+    "Connection checkouts from the database pool that failed",
+    ["reason"],  # timeout, error
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Open connections in the database pool")
+DB_POOL_IDLE = Gauge("db_pool_idle", "Idle connections in the database pool")
+DB_POOL_IN_USE = Gauge("db_pool_in_use", "Checked-out connections in the database pool")
+DB_POOL_MAX_SIZE = Gauge("db_pool_max_size", "Maximum size of the database pool")
+DB_POOL_SATURATION = Gauge(
+    "db_pool_saturation", "Fraction of the maximum pool size currently checked out"
+)
+
+# Prediction cache
+PREDICTION_CACHE_HITS = Counter("prediction_cache_hits_total", "Prediction cache hits")
+PREDICTION_CACHE_MISSES = Counter("prediction_cache_misses_total", "Prediction cache misses")
+PREDICTION_CACHE_EVICTIONS = Counter(
+    "prediction_cache_evictions_total", "Entries removed from the prediction cache", ["reason"]
+)
+PREDICTION_CACHE_COALESCED = Counter(
+    "prediction_cache_coalesced_total",
+    "Requests that waited on an identical in-flight computation instead of running their own",
+)
+PREDICTION_CACHE_SIZE = Gauge("prediction_cache_entries", "Entries in the prediction cache")
+
+# Feature drift against the training scaler statistics
+FEATURE_DRIFT_PSI = Gauge(
+    "feature_drift_psi", "Population stability index of live traffic per feature", ["feature"]
+)
+FEATURE_DRIFT_MEAN_SHIFT = Gauge(
+    "feature_drift_mean_shift",
+    "Live mean minus training mean in training standard deviations",
+    ["feature"],
+)
+FEATURE_DRIFT_VARIANCE_RATIO = Gauge(
+    "feature_drift_variance_ratio", "Live variance over training variance", ["feature"]
+)
+FEATURE_DRIFT_SAMPLES = Gauge(
+    "feature_drift_samples", "Weighted number of rows behind the drift scores"
+)
+
+# Per-stage latency of the prediction hot path
+PREDICTION_STAGE_SECONDS = Histogram(
+    "prediction_stage_seconds",
+    "Time spent in each stage of a prediction request",
+    ["stage", "model_version"],
+    buckets=(
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        1.0,
+    ),
+)
+
+# Cold start
+STARTUP_PHASE_SECONDS = Gauge(
+    "startup_phase_seconds", "Wall time spent in each application startup phase", ["phase"]
+)
+
+# Background health monitor
+HEALTH_COMPONENT_UP = Gauge(
+    "health_component_up",
+    "1 when the component passed its last background health check",
+    ["component"],  # model, database
+)
+SERVICE_READY = Gauge("service_ready", "1 when the instance reports ready for traffic")
+HEALTH_CHECK_AGE = Gauge(
+    "health_check_age_seconds", "Seconds since the cached health status was refreshed"
+)
+HEALTH_CHECK_DURATION = Histogram(
+    "health_check_duration_seconds", "Duration of one round of background health checks"
+)
+
+# Admission control
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Prediction requests rejected by admission control",
+    ["reason", "priority"],  # reason: queue_full, queue_timeout, quota
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time prediction requests waited for a concurrency slot",
+    ["priority"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Prediction requests holding a slot")
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Prediction requests waiting for a slot")
+
+# Application logging pipeline
+APP_LOG_RECORDS_DROPPED = Counter(
+    "app_log_records_dropped_total",
+    "Application log records not written",
+    ["reason"],  # overflow (queue full), sampled
+)
+APP_LOG_QUEUE_DEPTH = Gauge("app_log_queue_depth", "Application log records waiting to be written")
+
+# Prediction read-back
+PREDICTION_LOOKUPS = Counter(
+    "prediction_lookups_total",
+    "Lookups of logged predictions by request ID",
+    ["source"],  # cache, database, missing
+)
+PREDICTION_HISTORY_ROWS = Counter(
+    "prediction_history_rows_total",
+    "Logged prediction rows returned by the history endpoint",
+    ["format"],  # json, ndjson
+)
+RECENT_PREDICTIONS_SIZE = Gauge(
+    "recent_predictions_entries", "Recently created predictions held for lookups"
+)
@@ -0,0 +1,111 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger("diabetes-ml")
+
+# Leaf frames of threads that are blocked waiting for work, left out of the profile
+IDLE_FRAMES = (
+    "threading.py:wait",
+    "threading.py:_wait_for_tstate_lock",
+    "selectors.py:select",
+    "queue.py:get",
+    "thread.py:_worker",
+)
+
+
+class StackSampler:
+    # Sampling profiler that can be switched on at runtime. A background thread snapshots
+    # the stacks of all threads (event loop and executor pools) every interval, so the
+    # overhead does not depend on request volume and nothing is instrumented.
+    def __init__(self, interval_ms: float = 10.0, max_depth: int = 64):
+        self.interval_ms = interval_ms
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self.started_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_ms: Optional[float] = None, reset: bool = True):
+        if self.running:
+            return
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        if reset:
+            self.reset()
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started ({self.interval_ms:g} ms interval)")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Sampling profiler stopped after {self.sample_count} samples")
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.sample_count = 0
+
+    def _run(self):
+        own_id = threading.get_ident()
+        interval = self.interval_ms / 1000
+        while not self._stop.wait(interval):
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                stack = self._collapse(frame) if thread_id != own_id else ""
+                if stack and not stack.endswith(IDLE_FRAMES):
+                    stacks.append(stack)
+            with self._lock:
+                self.samples.update(stacks)
+                self.sample_count += 1
+
+    def _collapse(self, frame) -> str:
+        # Root-first "file:function;file:function" stack, the collapsed flame graph format
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        # Stacks with sample counts, ready for flamegraph.pl or speedscope
+        with self._lock:
+            stacks = self.samples.most_common(limit)
+        return "\n".join(f"{stack} {count}" for stack, count in stacks)
+
+    def top_functions(self, limit: int = 20) -> list:
+        # Functions on top of the sampled stacks, i.e. where time is actually spent
+        leaves = Counter()
+        with self._lock:
+            for stack, count in self.samples.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            total = sum(self.samples.values()) or 1
+        return [
+            {"function": name, "samples": count, "share": round(count / total, 4)}
+            for name, count in leaves.most_common(limit)
+        ]
+
+    def describe(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval_ms,
+            "samples": self.sample_count,
+            "top": self.top_functions(),
+        }
@@ -0,0 +1,247 @@
+import math
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+def parse_count(value) -> int:
+    # One count of a serialized state, a non-negative integer
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"Invalid count: {value!r}")
+    return value
+
+
+def parse_counts(value) -> Dict[int, int]:
+    # Bucket (or epoch second) -> count mapping of a serialized state
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected an object of counts, got {type(value).__name__}")
+    return {int(key): parse_count(count) for key, count in value.items()}
+
+
+class QuantileSketch:
+    # DDSketch-style quantile sketch: values fall into logarithmic buckets, so every
+    # quantile estimate is within `relative_accuracy` of the true value and two sketches
+    # with the same accuracy merge exactly by adding bucket counts.
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # Largest bucket key whose value is still a finite float
+        self.max_key = int(math.log(sys.float_info.max) / self._log_gamma)
+        self.positive: Dict[int, int] = defaultdict(int)
+        self.negative: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        # Scalar fast path for the per-request update
+        if not math.isfinite(value):
+            return
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value > 0:
+            self.positive[math.ceil(math.log(value) / self._log_gamma)] += 1
+            self._collapse(self.positive)
+        elif value < 0:
+            self.negative[math.ceil(math.log(-value) / self._log_gamma)] += 1
+            self._collapse(self.negative)
+        else:
+            self.zero_count += 1
+
+    def add_many(self, values: Iterable[float]):
+        # Vectorized insert, one bucket update per distinct key
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        self.count += int(values.size)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.zero_count += int((values == 0).sum())
+        for store, part in (
+            (self.positive, values[values > 0]),
+            (self.negative, -values[values < 0]),
+        ):
+            if part.size:
+                keys, counts = np.unique(
+                    np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True
+                )
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] += count
+                self._collapse(store)
+
+    def _collapse(self, store: Dict[int, int]):
+        # Bound memory by folding the smallest-magnitude buckets together
+        if len(store) <= self.max_buckets:
+            return
+        keys = sorted(store)
+        overflow = keys[: len(keys) - self.max_buckets + 1]
+        folded = sum(store.pop(key) for key in overflow)
+        store[overflow[-1]] += folded
+
+    def _value(self, key: int) -> float:
+        return self.gamma**key * (2 / (self.gamma + 1))
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        # Walk from the most negative value up to the largest positive one
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return max(min(self._value(key), self.max), self.min)
+        return self.max
+
+    def summary(self, quantiles=(0.5, 0.9, 0.95, 0.99)) -> dict:
+        result = {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in quantiles:
+            result[f"p{round(q * 100):d}"] = self.quantile(q)
+        return result
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for store, other_store in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_store.items():
+                store[key] += count
+            self._collapse(store)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(key): count for key, count in self.positive.items()},
+            "negative": {str(key): count for key, count in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict, max_buckets: int = 2048) -> "QuantileSketch":
+        # Any malformed state (e.g. one posted to /stats/merge) raises ValueError
+        if not isinstance(state, dict):
+            raise ValueError("Sketch state must be an object")
+        try:
+            relative_accuracy = float(state["relative_accuracy"])
+            if not 0 < relative_accuracy < 1:
+                raise ValueError("relative_accuracy must be between 0 and 1")
+            sketch = cls(relative_accuracy, max_buckets)
+            for store, name in ((sketch.positive, "positive"), (sketch.negative, "negative")):
+                store.update(parse_counts(state[name]))
+                if any(abs(key) > sketch.max_key for key in store):
+                    raise ValueError(f"{name} bucket key out of range ±{sketch.max_key}")
+            sketch.zero_count = parse_count(state["zero_count"])
+            sketch.count = parse_count(state["count"])
+            buckets = sum(sketch.positive.values()) + sum(sketch.negative.values())
+            if sketch.count != sketch.zero_count + buckets:
+                raise ValueError("count must equal zero_count plus the bucket counts")
+            sketch.sum = float(state["sum"])
+            if sketch.count:
+                sketch.min = float(state["min"])
+                sketch.max = float(state["max"])
+                values = (sketch.sum, sketch.min, sketch.max)
+                if not all(map(math.isfinite, values)) or sketch.min > sketch.max:
+                    raise ValueError("sum, min and max must be finite with min <= max")
+        except (KeyError, TypeError, OverflowError, ZeroDivisionError) as e:
+            raise ValueError(f"Malformed sketch state: {e!r}")
+        return sketch
+
+
+class SlidingWindowCounter:
+    # Event counts in one-second buckets keyed by epoch second, so counters from
+    # different processes line up and merge by adding the buckets.
+    def __init__(self, horizon: int = 900):
+        self.horizon = horizon
+        self._seconds = np.full(horizon, -1, dtype=np.int64)
+        self._counts = np.zeros(horizon, dtype=np.int64)
+
+    def add(self, count: int = 1, now: Optional[float] = None):
+        self._add(int(now if now is not None else time.time()), count)
+
+    def _add(self, second: int, count: int):
+        slot = second % self.horizon
+        if second < self._seconds[slot]:
+            # Older than the second this slot already tracks, outside the horizon
+            return
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += count
+
+    def total(self, window: int, now: Optional[float] = None) -> int:
+        # Events in the last `window` seconds, including the current one
+        second = int(now if now is not None else time.time())
+        recent = (self._seconds > second - min(window, self.horizon)) & (self._seconds <= second)
+        return int(self._counts[recent].sum())
+
+    def rate(self, window: int, now: Optional[float] = None) -> float:
+        return self.total(window, now) / min(window, self.horizon)
+
+    def merge(self, other: "SlidingWindowCounter"):
+        for second, count in other.to_dict()["buckets"].items():
+            self._add(int(second), count)
+
+    def to_dict(self) -> dict:
+        live = self._seconds >= 0
+        return {
+            "horizon": self.horizon,
+            "buckets": {
+                str(second): int(count)
+                for second, count in zip(self._seconds[live].tolist(), self._counts[live].tolist())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict, max_horizon: int = 900) -> "SlidingWindowCounter":
+        # Any malformed state raises ValueError. The horizon sizes the bucket arrays, so it is
+        # capped at max_horizon (the horizon of the counter it is merged into).
+        if not isinstance(state, dict):
+            raise ValueError("Counter state must be an object")
+        try:
+            horizon = parse_count(state["horizon"])
+            if not 0 < horizon <= max_horizon:
+                raise ValueError(f"horizon must be between 1 and {max_horizon}")
+            counter = cls(horizon)
+            for second, count in parse_counts(state["buckets"]).items():
+                if not 0 <= second < 2**62 or count >= 2**62:
+                    raise ValueError(f"Invalid bucket {second}: {count}")
+                counter._add(second, count)
+        except (KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f"Malformed counter state: {e!r}")
+        return counter
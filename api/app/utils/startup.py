@@ -0,0 +1,32 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from app.utils.metrics import STARTUP_PHASE_SECONDS
+
+logger = logging.getLogger("diabetes-ml")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        # Accumulate wall time spent in a startup phase
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start_time
+
+    def report(self):
+        # Log the phase breakdown and export it as a metric
+        for name, seconds in self.phases.items():
+            STARTUP_PHASE_SECONDS.labels(phase=name).set(seconds)
+        breakdown = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+        logger.info(f"Startup timings: {breakdown}")
+
+
+# Shared by the services initialized during application startup
+startup_timer = StartupTimer()
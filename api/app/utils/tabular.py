@@ -0,0 +1,78 @@
+import glob
+import json
+import os
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+TABULAR_EXTENSIONS = (".csv", ".parquet")
+# Written by export_logs.py at the root of an export, lists the files it has published
+MANIFEST_NAME = "manifest.json"
+
+
+def manifest_paths(path: str, since: Optional[str] = None) -> List[str]:
+    # Files listed in an export manifest, only those of date partitions on or after `since`
+    # (YYYY-MM-DD) when given. Files not in the manifest (unfinished runs) are never read.
+    with open(path) as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(path))
+    return [
+        os.path.join(root, entry["path"])
+        for entry in manifest["files"]
+        if since is None or entry["date"] >= since
+    ]
+
+
+def resolve_paths(path: str, since: Optional[str] = None) -> List[str]:
+    # A single file, a directory searched recursively (e.g. date=... partitions), a glob, or
+    # an export manifest (also used when a directory has one at its root)
+    if os.path.isdir(path) and os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+        path = os.path.join(path, MANIFEST_NAME)
+    if os.path.basename(path) == MANIFEST_NAME:
+        paths = manifest_paths(path, since)
+        if not paths:
+            raise FileNotFoundError(f"No exported files to read in {path}")
+        return paths
+    if since is not None:
+        raise ValueError("Selecting partitions by date needs an export manifest")
+
+    if os.path.isdir(path):
+        paths = []
+        for root, dirs, names in os.walk(path):
+            # Hidden directories (e.g. .staging-* left by an interrupted export) are skipped
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            paths.extend(os.path.join(root, name) for name in names if not name.startswith("."))
+    elif os.path.isfile(path):
+        paths = [path]
+    else:
+        paths = glob.glob(path, recursive=True)
+
+    paths = sorted(p for p in paths if p.endswith(TABULAR_EXTENSIONS))
+    if not paths:
+        raise FileNotFoundError(f"No CSV or Parquet files found at {path}")
+    return paths
+
+
+def iter_chunks(
+    paths: Sequence[str], columns: Sequence[str], chunk_rows: int = 50000
+) -> Iterator[np.ndarray]:
+    # Stream float64 matrices of at most chunk_rows rows, with only the requested columns read.
+    # pandas (CSV) and pyarrow (Parquet) are imported only when such files are read.
+    columns = list(columns)
+    for path in paths:
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+                yield np.column_stack(
+                    [
+                        batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+                        for name in columns
+                    ]
+                )
+        else:
+            import pandas as pd
+
+            for frame in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+                yield frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
@@ -0,0 +1,136 @@
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.utils.metrics import PREDICTION_STAGE_SECONDS
+
+TRACE_HEADER = "X-Trace-Id"
+# Incoming trace IDs are accepted only if they look like an ID, anything else is replaced
+VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestTrace:
+    # Per-request timing state shared between the middleware and the handler
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.request_id: Optional[str] = None
+        self.model_version: Optional[str] = None
+        self.started = time.perf_counter()
+        self.handler_done: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def observe(self):
+        # Export stage timings once the model version that served the request is known
+        version = self.model_version or "none"
+        for stage, seconds in self.stages.items():
+            PREDICTION_STAGE_SECONDS.labels(stage=stage, model_version=version).observe(seconds)
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+def record_stage(stage: str, seconds: float, model_version: Optional[str] = None):
+    # Attach a stage timing to the current request, or export it directly outside of one
+    trace = _current_trace.get()
+    if trace is not None and model_version is None:
+        trace.record(stage, seconds)
+    else:
+        PREDICTION_STAGE_SECONDS.labels(stage=stage, model_version=model_version or "none").observe(
+            seconds
+        )
+
+
+def record_since_start(stage: str):
+    # Time from receiving the request until now, e.g. body parsing and validation
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(stage, time.perf_counter() - trace.started)
+
+
+@contextmanager
+def stage(name: str, model_version: Optional[str] = None):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start_time, model_version)
+
+
+def bind_request(request_id: Optional[str] = None, model_version: Optional[str] = None):
+    # Tie the current trace to a prediction request and the model version that served it
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    if request_id is not None:
+        trace.request_id = request_id
+    if model_version is not None:
+        trace.model_version = model_version
+
+
+def mark_handler_done():
+    # Everything after this point until the response starts counts as serialization
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.handler_done = time.perf_counter()
+
+
+class TraceMiddleware:
+    # Pure ASGI middleware: assigns a trace ID, echoes it in the X-Trace-Id response header
+    # and exports the stage timings collected while the request was handled
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-trace-id":
+                incoming = value.decode("latin-1")
+                break
+        if incoming is None or not VALID_TRACE_ID.match(incoming):
+            incoming = uuid.uuid4().hex
+
+        trace = RequestTrace(incoming)
+        token = _current_trace.set(trace)
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                if trace.handler_done is not None:
+                    trace.record("serialize", time.perf_counter() - trace.handler_done)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            trace.observe()
+            _current_trace.reset(token)
+
+
+class TraceContextFilter(logging.Filter):
+    # Adds the trace ID, request ID and model version of the current request to every log
+    # record. Runs in the thread that logs, since the trace lives in a context variable.
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = _current_trace.get()
+        record.trace_id = trace.trace_id if trace is not None else "-"
+        record.request_id = trace.request_id if trace is not None and trace.request_id else "-"
+        record.model_version = (
+            trace.model_version if trace is not None and trace.model_version else "-"
+        )
+        return True
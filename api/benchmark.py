@@ -0,0 +1,423 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+TRAINED_MODEL_DIR = "../trained_model"
+RESULTS_PATH = "./benchmark_results.json"
+BASELINE_PATH = "./benchmark_baseline.json"
+BENCH_BUCKET = "diabetes-ml-bench"
+BENCH_PREFIX = "tf_model"
+
+# Allowed relative change against the baseline before a metric counts as a regression
+DEFAULT_THRESHOLD = 0.2
+
+
+class InMemoryConnection:
+    """
+    Stand-in for an asyncpg connection that keeps written log rows in memory
+    Advisory locks are never granted, so log table maintenance is skipped
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, query, *args):
+        if args and "unnest" in query:
+            self.rows.extend(zip(*args))
+        return "OK"
+
+    async def fetchval(self, query, *args):
+        return None
+
+    async def fetch(self, query, *args):
+        return []
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.rows.extend(records)
+
+
+def in_memory_database(config):
+    """
+    Returns a DatabaseService that writes to memory instead of PostgreSQL
+    Measures the application side of the write path without a database server
+    """
+    from app.services.db_service import DatabaseService
+
+    class InMemoryDatabaseService(DatabaseService):
+        def __init__(self, config):
+            super().__init__(config)
+            self.rows = []
+
+        async def initialize(self, migrate=True):
+            return True
+
+        @asynccontextmanager
+        async def get_connection(self):
+            yield InMemoryConnection(self.rows)
+
+        async def close(self):
+            self.rows.clear()
+
+    return InMemoryDatabaseService(config)
+
+
+@contextmanager
+def model_source(kind, cache_dir):
+    """
+    Serves the trained model from a local directory or from an in-process fake S3 (moto)
+    Yields the MODEL_SOURCE value to use
+    """
+    if kind == "file":
+        yield f"file://{os.path.abspath(TRAINED_MODEL_DIR)}"
+        return
+
+    try:
+        import boto3
+        from moto import mock_aws
+    except ImportError:
+        raise RuntimeError("The fake S3 source needs moto: pip install 'moto[s3]'")
+
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BENCH_BUCKET)
+        for name in ("model.h5", "model_weights.npz", "scaler.pkl"):
+            local_name = "tf_model.h5" if name == "model.h5" else name
+            s3.upload_file(
+                os.path.join(TRAINED_MODEL_DIR, local_name), BENCH_BUCKET, f"{BENCH_PREFIX}/{name}"
+            )
+        yield f"s3://{BENCH_BUCKET}/{BENCH_PREFIX}"
+
+
+def configure_environment(args, source, cache_dir):
+    """
+    Sets the environment read by Config for a reproducible, offline benchmark run
+    """
+    os.environ.update(
+        MODEL_SOURCE=source,
+        MODEL_CACHE_DIR=cache_dir,
+        MODEL_POLL_INTERVAL="0",
+        LOG_MAINTENANCE_INTERVAL="0",
+        INFERENCE_ENGINE=args.engine,
+        ENABLE_CLOUDWATCH="false",
+        AWS_DEFAULT_REGION=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+    )
+    if args.db == "memory":
+        os.environ.update(DB_HOST="in-memory", DB_USER="bench", DB_PASSWORD="bench")
+
+
+def percentiles(samples):
+    """
+    Returns p50/p95/p99 and mean of latency samples (seconds) in milliseconds
+    """
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+    }
+
+
+def random_rows(rng, scaler, n):
+    """
+    Returns n request bodies drawn around the training distribution
+    """
+    values = rng.normal(scaler.mean_, np.sqrt(scaler.var_), size=(n, len(scaler.mean_)))
+    return [{f"x{i + 1}": float(v) for i, v in enumerate(row)} for row in values]
+
+
+async def start_services(args):
+    """
+    Creates and initializes the service registry, swapping in the in-memory database if asked
+    Returns the registry and the cold start time in seconds
+    """
+    from app.config import Config
+    from app.services.registry import ServiceRegistry
+
+    config = Config()
+    db_service = in_memory_database(config) if args.db == "memory" else None
+    services = ServiceRegistry(config, db_service)
+
+    start_time = time.perf_counter()
+    await services.initialize()
+    return services, time.perf_counter() - start_time
+
+
+def build_app(services):
+    """
+    Returns the API wired to an already initialized registry
+    """
+    from app.api.endpoints import router
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    app.include_router(router)
+    app.state.services = services
+    return app
+
+
+async def bench_latency(client, rows, warmup):
+    """
+    Sequential single-row /predict latency
+    """
+    for row in rows[:warmup]:
+        await client.post("/predict", json=row)
+
+    samples = []
+    for row in rows[warmup:]:
+        start_time = time.perf_counter()
+        response = await client.post("/predict", json=row)
+        samples.append(time.perf_counter() - start_time)
+        response.raise_for_status()
+    return samples
+
+
+async def bench_concurrent(client, rows, concurrency):
+    """
+    Single-row /predict throughput with a fixed number of requests in flight
+    """
+    queue = list(rows)
+
+    async def worker():
+        while queue:
+            response = await client.post("/predict", json=queue.pop())
+            response.raise_for_status()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(rows) / (time.perf_counter() - start_time)
+
+
+async def bench_batch(client, rows, batch_size, repeats):
+    """
+    /predict/batch throughput in rows per second
+    """
+    batch = {"rows": rows[:batch_size]}
+    await client.post("/predict/batch", json=batch)
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        response = await client.post("/predict/batch", json=batch)
+        response.raise_for_status()
+    return batch_size * repeats / (time.perf_counter() - start_time)
+
+
+async def bench_db_writes(db_service, rows, chunk_size):
+    """
+    Bulk log write throughput (COPY and multi-row INSERT) in rows per second
+    """
+    now = datetime.now(timezone.utc)
+    records = [
+        (now, f"bench-{i}", *row.values(), 100.0, "ok", None, 0.001, "bench")
+        for i, row in enumerate(rows)
+    ]
+    chunks = []
+    for start in range(0, len(records), chunk_size):
+        stop = start + chunk_size
+        chunks.append(records[start:stop])
+
+    results = {}
+    for method, write in (
+        ("copy", db_service.copy_predictions),
+        ("insert", db_service.insert_predictions),
+    ):
+        start_time = time.perf_counter()
+        for chunk in chunks:
+            await write(chunk)
+        results[f"{method}_rows_per_second"] = len(records) / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    for record in records[:chunk_size]:
+        await db_service.log_prediction(
+            record[1], list(record[2:12]), 100.0, "ok", 0.001, model_version="bench"
+        )
+    results["single_insert_rows_per_second"] = chunk_size / (time.perf_counter() - start_time)
+    return results
+
+
+async def run_benchmarks(args):
+    """
+    Runs every benchmark against a fresh registry and returns a flat metric dict
+    """
+    import httpx
+
+    rng = np.random.default_rng(args.seed)
+    metrics = {}
+
+    # Cold start downloads from the source into an empty cache, warm start reuses it
+    services, cold_start = await start_services(args)
+    metrics["startup.cold_seconds"] = cold_start
+    await services.shutdown()
+    services, warm_start = await start_services(args)
+    metrics["startup.warm_seconds"] = warm_start
+
+    try:
+        scaler = services.model_service.scaler
+        transport = httpx.ASGITransport(app=build_app(services))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            unique_rows = random_rows(rng, scaler, args.requests + args.warmup)
+            samples = await bench_latency(client, unique_rows, args.warmup)
+            for name, value in percentiles(samples).items():
+                metrics[f"predict.cache_miss.{name}"] = value
+
+            if services.model_service.cache is not None:
+                repeated = [unique_rows[0]] * (args.requests + args.warmup)
+                samples = await bench_latency(client, repeated, args.warmup)
+                for name, value in percentiles(samples).items():
+                    metrics[f"predict.cache_hit.{name}"] = value
+
+            concurrent_rows = random_rows(rng, scaler, args.requests)
+            metrics["predict.concurrent.requests_per_second"] = await bench_concurrent(
+                client, concurrent_rows, args.concurrency
+            )
+
+            batch_rows = random_rows(rng, scaler, args.batch_size)
+            metrics["predict_batch.rows_per_second"] = await bench_batch(
+                client, batch_rows, args.batch_size, args.batch_repeats
+            )
+
+        write_rows = random_rows(rng, scaler, args.db_rows)
+        for name, value in (
+            await bench_db_writes(services.db_service, write_rows, services.config.log_flush_size)
+        ).items():
+            metrics[f"db_write.{name}"] = value
+    finally:
+        await services.shutdown()
+
+    return metrics
+
+
+def higher_is_better(name):
+    return name.endswith("_per_second")
+
+
+def compare(results, baseline, default_threshold):
+    """
+    Compares metrics against the baseline
+    Returns a list of (metric, baseline, current, relative change, regressed) tuples
+    """
+    thresholds = baseline.get("thresholds", {})
+    rows = []
+    for name, expected in baseline["metrics"].items():
+        if name not in results["metrics"] or not expected:
+            continue
+        current = results["metrics"][name]
+        change = (current - expected) / expected
+        worse = -change if higher_is_better(name) else change
+        rows.append(
+            (name, expected, current, change, worse > thresholds.get(name, default_threshold))
+        )
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks for the API")
+    parser.add_argument(
+        "--source",
+        choices=("s3", "file"),
+        default="s3",
+        help="Model source: in-process fake S3 (moto) or the local directory",
+    )
+    parser.add_argument(
+        "--db",
+        choices=("memory", "postgres"),
+        default="memory",
+        help="In-process database stand-in or the PostgreSQL set by DB_* variables",
+    )
+    parser.add_argument("--engine", choices=("numpy", "keras"), default="numpy")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--batch-repeats", type=int, default=20)
+    parser.add_argument("--db-rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed relative slowdown before a metric fails",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store this run as the new baseline"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cache_dir = tempfile.mkdtemp(prefix="diabetes-ml-bench-")
+    try:
+        with model_source(args.source, cache_dir) as source:
+            configure_environment(args, source, cache_dir)
+            metrics = asyncio.run(run_benchmarks(args))
+
+        results = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "settings": vars(args),
+            "metrics": metrics,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        for name, value in metrics.items():
+            print(f"{name:50s} {value:12.3f}")
+        print(f"Results written to {args.output}")
+
+        if args.save_baseline:
+            shutil.copyfile(args.output, args.baseline)
+            print(f"Baseline saved to {args.baseline}")
+            return True
+
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+            return True
+
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("source", "db", "engine"):
+            if baseline.get("settings", {}).get(key) != getattr(args, key):
+                print(
+                    f"⚠️ Baseline was recorded with a different --{key}, results are not comparable"
+                )
+        regressions = 0
+        for name, expected, current, change, regressed in compare(
+            results, baseline, args.threshold
+        ):
+            regressions += regressed
+            marker = "❌" if regressed else "✅"
+            print(f"{marker} {name:48s} {expected:12.3f} → {current:12.3f} ({change:+.1%})")
+
+        if regressions:
+            print(f"{regressions} metrics regressed beyond the threshold")
+            return False
+        return True
+
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return False
+
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
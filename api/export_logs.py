@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+COMPRESSIONS = ("zstd", "snappy", "gzip", "none")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Incrementally export the prediction log to date-partitioned Parquet"
+    )
+    parser.add_argument("target", help="Local directory or s3://bucket/prefix")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="Rows read per query")
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=10,
+        help="Wait after reading the highest row ID, so inserts holding lower IDs commit first",
+    )
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="zstd")
+    return parser.parse_args()
+
+
+def arrow_schema():
+    """
+    Parquet schema of the exported rows: the logs columns with their database id
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("request_id", pa.string()),
+            *[(f"x{i}", pa.float64()) for i in range(1, 11)],
+            ("prediction", pa.float64()),
+            ("status", pa.string()),
+            ("error", pa.string()),
+            ("processing_time", pa.float64()),
+            ("model_version", pa.string()),
+        ]
+    )
+
+
+class ExportTarget:
+    """
+    Root of an export on the local disk or S3, holding date=YYYY-MM-DD/ partitions and the
+    manifest. The manifest is written last, so files of an interrupted run are never listed.
+    """
+
+    def __init__(self, uri):
+        from app.utils.tabular import MANIFEST_NAME
+
+        parsed = urlparse(uri)
+        self.uri = uri.rstrip("/")
+        self.is_s3 = parsed.scheme == "s3"
+        if self.is_s3:
+            import boto3
+
+            self.bucket = parsed.netloc
+            self.prefix = parsed.path.strip("/")
+            self.manifest_key = f"{self.prefix}/{MANIFEST_NAME}".lstrip("/")
+            self.s3 = boto3.client("s3", endpoint_url=os.getenv("S3_ENDPOINT_URL"))
+        else:
+            self.root = uri
+            self.manifest_path = os.path.join(uri, MANIFEST_NAME)
+            os.makedirs(self.root, exist_ok=True)
+
+    def staging_dir(self):
+        """
+        Directory the files of a run are written to before they are published
+        Local targets stage next to the partitions, so publishing is a rename
+        """
+        return tempfile.mkdtemp(prefix=".staging-", dir=None if self.is_s3 else self.root)
+
+    def remove_stale_staging(self):
+        """
+        Removes staging directories left in a local target by runs that crashed
+        """
+        if self.is_s3:
+            return
+        for name in os.listdir(self.root):
+            if name.startswith(".staging-"):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                print(f"Removed staging directory {name} of an interrupted run")
+
+    def read_manifest(self):
+        if self.is_s3:
+            try:
+                body = self.s3.get_object(Bucket=self.bucket, Key=self.manifest_key)["Body"]
+            except self.s3.exceptions.NoSuchKey:
+                return None
+            return json.loads(body.read())
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def publish(self, local_path, relative_path):
+        if self.is_s3:
+            key = f"{self.prefix}/{relative_path}".lstrip("/")
+            self.s3.upload_file(local_path, self.bucket, key)
+        else:
+            destination = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(local_path, destination)
+
+    def write_manifest(self, manifest):
+        content = json.dumps(manifest, indent=2)
+        if self.is_s3:
+            self.s3.put_object(Bucket=self.bucket, Key=self.manifest_key, Body=content.encode())
+            return
+        partial = self.manifest_path + ".partial"
+        with open(partial, "w") as f:
+            f.write(content)
+        os.replace(partial, self.manifest_path)
+
+
+def records_to_table(records, schema):
+    """
+    Converts one chunk of database records to an Arrow table
+    """
+    import pyarrow as pa
+
+    return pa.Table.from_pydict(
+        {name: [record[name] for record in records] for name in schema.names}, schema=schema
+    )
+
+
+async def export_rows(db_service, watermark, fence, staging, run_id, args):
+    """
+    Reads the logs rows with watermark < id <= fence in ID-ordered chunks and appends them to
+    one Parquet file per UTC date, holding a single chunk in memory
+    Returns the written files as {date: (local path, stats)}
+    """
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    compression = None if args.compression == "none" else args.compression
+    writers, files = {}, {}
+    after = watermark
+    try:
+        while True:
+            records = await db_service.fetch_predictions_by_id(after, fence, args.chunk_rows)
+            if not records:
+                break
+            # Rows come in insert order, late rows (spilled, or queued during an outage) carry
+            # their original timestamp and go to the file of that date
+            by_date = defaultdict(list)
+            for record in records:
+                by_date[record["timestamp"].date().isoformat()].append(record)
+            for date, rows in by_date.items():
+                if date not in writers:
+                    path = os.path.join(staging, f"date={date}", f"part-{run_id}.parquet")
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    writers[date] = pq.ParquetWriter(path, schema, compression=compression)
+                    files[date] = (path, {"rows": 0})
+                writers[date].write_table(records_to_table(rows, schema))
+                stats = files[date][1]
+                stats["rows"] += len(rows)
+                low = min(row["timestamp"] for row in rows)
+                high = max(row["timestamp"] for row in rows)
+                stats["min_timestamp"] = min(stats.get("min_timestamp", low), low)
+                stats["max_timestamp"] = max(stats.get("max_timestamp", high), high)
+
+            after = records[-1]["id"]
+            print(f"Exported rows up to id {after}")
+            if len(records) < args.chunk_rows:
+                break
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return files
+
+
+def read_watermark(manifest):
+    """
+    ID of the last exported row, 0 before the first run
+    """
+    watermark = manifest["watermark"]
+    if watermark is None:
+        return 0
+    # Manifests of earlier versions also hold the timestamp of that row
+    return int(watermark["id"])
+
+
+async def run_export(args):
+    """
+    Exports the rows inserted since the last run and publishes them with an updated manifest
+    Returns the number of exported rows
+    """
+    from app.config import Config
+    from app.services.db_service import DatabaseService
+
+    target = ExportTarget(args.target)
+    target.remove_stale_staging()
+    manifest = target.read_manifest() or {
+        "format": "parquet",
+        "columns": arrow_schema().names,
+        "partitioning": "date",
+        "watermark": None,
+        "files": [],
+    }
+    watermark = read_watermark(manifest)
+
+    db_service = DatabaseService(Config())
+    await db_service.initialize(migrate=False)
+    staging = None
+    try:
+        # The watermark follows the row ID, which is assigned at insert time, so rows that
+        # reach the database late (replayed from the spill file, queued during an outage)
+        # are exported by the next run whatever their timestamp. An insert may still be
+        # committing rows below the highest visible ID, so wait before reading up to it.
+        fence = await db_service.fetch_max_log_id()
+        if fence is None or fence <= watermark:
+            print(f"Nothing to export, no rows after id {watermark}")
+            return 0
+        await asyncio.sleep(args.settle_seconds)
+
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        staging = target.staging_dir()
+        files = await export_rows(db_service, watermark, fence, staging, run_id, args)
+        for date, (path, stats) in sorted(files.items()):
+            relative_path = f"date={date}/part-{run_id}.parquet"
+            size = os.path.getsize(path)
+            target.publish(path, relative_path)
+            manifest["files"].append(
+                {
+                    "path": relative_path,
+                    "date": date,
+                    "rows": stats["rows"],
+                    "bytes": size,
+                    "min_timestamp": stats["min_timestamp"].isoformat(),
+                    "max_timestamp": stats["max_timestamp"].isoformat(),
+                    "compression": args.compression,
+                    "exported_at": run_id,
+                }
+            )
+            print(f"Wrote {stats['rows']} rows to {target.uri}/{relative_path}")
+        manifest["watermark"] = {"id": fence}
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        target.write_manifest(manifest)
+        return sum(stats["rows"] for _, stats in files.values())
+    finally:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        await db_service.close()
+
+
+def main():
+    args = parse_args()
+    try:
+        started = time.perf_counter()
+        rows = asyncio.run(run_export(args))
+        elapsed = time.perf_counter() - started
+        print(f"✅ Exported {rows} rows in {elapsed:.1f}s")
+        return True
+
+    except Exception as e:
+        print(f"❌ Export failed: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
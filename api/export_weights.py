@@ -0,0 +1,92 @@
+import json
+import pickle
+import sys
+
+import numpy as np
+import tensorflow as tf
+from app.services.numpy_engine import NumpyEngine, load_layers
+
+MODEL_PATH = "./trained_model/tf_model.h5"
+SCALER_PATH = "./trained_model/scaler.pkl"
+WEIGHTS_PATH = "./trained_model/model_weights.npz"
+
+
+def export_layers(model):
+    """
+    Extracts the Dense/BatchNormalization/Dropout layers of a Keras model
+    Returns the layer spec and a dict of named float32 arrays
+    """
+    spec = []
+    arrays = {}
+    for i, layer in enumerate(model.layers):
+        if isinstance(layer, tf.keras.layers.Dense):
+            spec.append({"type": "dense", "activation": layer.get_config()["activation"]})
+            arrays[f"layer{i}_kernel"] = layer.kernel.numpy()
+            if layer.use_bias:
+                arrays[f"layer{i}_bias"] = layer.bias.numpy()
+        elif isinstance(layer, tf.keras.layers.BatchNormalization):
+            spec.append({"type": "batch_norm", "epsilon": float(layer.epsilon)})
+            if layer.scale:
+                arrays[f"layer{i}_gamma"] = layer.gamma.numpy()
+            if layer.center:
+                arrays[f"layer{i}_beta"] = layer.beta.numpy()
+            arrays[f"layer{i}_moving_mean"] = layer.moving_mean.numpy()
+            arrays[f"layer{i}_moving_variance"] = layer.moving_variance.numpy()
+        elif isinstance(layer, tf.keras.layers.Dropout):
+            spec.append({"type": "dropout"})
+        else:
+            raise ValueError(f"Unsupported layer for NumPy export: {layer.__class__.__name__}")
+
+    return spec, {name: value.astype(np.float32) for name, value in arrays.items()}
+
+
+def check_parity(model, scaler, weights_path, n_samples=1000, tolerance=1e-3):
+    """
+    Compares NumPy engine output against Keras on random and boundary inputs
+    Returns True if the maximum relative difference is within tolerance
+    """
+    rng = np.random.default_rng(42)
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    features = np.vstack(
+        [
+            mean + scale * rng.normal(size=(n_samples, n_features)),
+            mean + scale * rng.uniform(-5, 5, size=(n_samples, n_features)),
+            mean[None, :],
+        ]
+    )
+
+    expected = model.predict(scaler.transform(features), verbose=0)[:, 0]
+    actual = NumpyEngine.from_layers(load_layers(weights_path), scaler).predict(features)
+
+    diff = np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0)
+    print(f"Parity check on {len(features)} rows: max relative difference {diff.max():.2e}")
+    return bool(diff.max() <= tolerance)
+
+
+def main():
+    try:
+        model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+        with open(SCALER_PATH, "rb") as f:
+            scaler = pickle.load(f)
+
+        spec, arrays = export_layers(model)
+        np.savez_compressed(WEIGHTS_PATH, spec=np.array(json.dumps(spec)), **arrays)
+        print(f"Exported {len(spec)} layers → {WEIGHTS_PATH}")
+
+        if not check_parity(model, scaler, WEIGHTS_PATH):
+            print("❌ NumPy engine output does not match Keras")
+            return False
+
+        print("✅ NumPy engine matches Keras output")
+        return True
+
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
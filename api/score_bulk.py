@@ -0,0 +1,301 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+OUTPUT_COLUMNS = ("row", "prediction")
+OUTPUT_FORMATS = (".csv", ".parquet")
+
+# Model service of each worker process, loaded once by _init_worker
+_model_service = None
+
+
+def configure_environment(args):
+    """
+    Points the application config at the model source and turns off online-only features
+    Worker processes inherit this environment
+    """
+    if args.source:
+        os.environ["MODEL_SOURCE"] = args.source
+    if args.engine:
+        os.environ["INFERENCE_ENGINE"] = args.engine
+    os.environ["INFERENCE_BATCHING"] = "false"
+    os.environ["PREDICTION_CACHE"] = "false"
+    os.environ["DRIFT_MONITOR"] = "false"
+
+
+def resolve_model_version():
+    """
+    Syncs the model artifacts once in the parent, so workers load them from the warm cache
+    Returns the version the workers are expected to load
+    """
+    from app.config import Config
+    from app.services.model_service import ModelService
+
+    service = ModelService(Config(require_database=False))
+    version, _, _ = service.resolve(service.artifacts.sync())
+    return version
+
+
+def _init_worker():
+    """
+    Runs once per worker process: loads the model through the same loader as the API,
+    with one TensorFlow thread per process since the parallelism comes from the pool
+    """
+    global _model_service
+    from app.config import Config
+    from app.services.model_service import ModelService
+
+    config = Config(require_database=False)
+    if config.inference_engine == "keras":
+        import tensorflow as tf
+
+        tf.config.threading.set_intra_op_parallelism_threads(1)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    _model_service = ModelService(config)
+    _model_service.initialize()
+
+
+def score_chunk(features):
+    """
+    Vectorized forward pass over one chunk
+    Rows with missing or non-finite features get a NaN prediction so the output stays aligned
+    """
+    valid = np.isfinite(features).all(axis=1)
+    predictions = np.full(len(features), np.nan)
+    version = _model_service.model_version
+    if valid.any():
+        predictions[valid], version = _model_service.predict_batch(features[valid])
+    return predictions, version
+
+
+def score_in_order(pool, chunks, window):
+    """
+    Keeps up to window chunks in flight and yields results in input order
+    Bounds memory, unlike Pool.imap which reads the whole input ahead
+    """
+    pending = deque()
+    for key, features in chunks:
+        pending.append((key, pool.submit(score_chunk, features)))
+        if len(pending) >= window:
+            key, future = pending.popleft()
+            yield key, *future.result()
+    while pending:
+        key, future = pending.popleft()
+        yield key, *future.result()
+
+
+def input_signature(paths):
+    """
+    Identifies the input files, a checkpoint is only resumed against unchanged input
+    """
+    return [[path, os.path.getsize(path), os.stat(path).st_mtime_ns] for path in paths]
+
+
+def load_checkpoint(path, expected):
+    """
+    Returns the number of chunks already written, 0 when starting fresh
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    with open(path) as f:
+        checkpoint = json.load(f)
+    for key, value in expected.items():
+        if checkpoint.get(key) != value:
+            raise ValueError(
+                f"Checkpoint {path} was written with a different {key}, "
+                f"rerun with --restart to discard it"
+            )
+    return checkpoint["chunks_done"], checkpoint["rows_done"]
+
+
+def save_checkpoint(path, expected, chunks_done, rows_done):
+    """
+    Atomically records progress after a chunk has been written
+    """
+    partial = f"{path}.part"
+    with open(partial, "w") as f:
+        json.dump({**expected, "chunks_done": chunks_done, "rows_done": rows_done}, f)
+    os.replace(partial, path)
+
+
+def part_path(parts_dir, index, extension):
+    return os.path.join(parts_dir, f"part-{index:06d}{extension}")
+
+
+def write_part(path, rows, predictions, extension):
+    """
+    Writes the predictions of one chunk, atomically so a crash never leaves a torn part
+    """
+    partial = f"{path}.part"
+    if extension == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # NaN predictions (rows with missing features) are written as nulls
+        prediction = pa.array(predictions, type=pa.float64(), from_pandas=True)
+        pq.write_table(
+            pa.table({"row": rows, "prediction": prediction}), partial, compression="zstd"
+        )
+    else:
+        # NaN predictions (rows with missing features) are written as empty fields
+        with open(partial, "w") as f:
+            f.writelines(
+                f"{row},{'' if np.isnan(prediction) else f'{prediction:.6f}'}\n"
+                for row, prediction in zip(np.asarray(rows).tolist(), predictions.tolist())
+            )
+    os.replace(partial, path)
+
+
+def merge_parts(parts_dir, chunks, output, extension):
+    """
+    Concatenates the parts into the output file in chunk order, one part in memory at a time
+    """
+    partial = f"{output}.part"
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for index in range(chunks):
+                table = pq.read_table(part_path(parts_dir, index, extension))
+                if writer is None:
+                    writer = pq.ParquetWriter(partial, table.schema, compression="zstd")
+                writer.write_table(table)
+            if writer is None:
+                import pyarrow as pa
+
+                pq.write_table(
+                    pa.table({"row": pa.array([], pa.int64()), "prediction": pa.array([])}),
+                    partial,
+                )
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(partial, "w") as out:
+            out.write(",".join(OUTPUT_COLUMNS) + "\n")
+            for index in range(chunks):
+                with open(part_path(parts_dir, index, extension)) as f:
+                    shutil.copyfileobj(f, out)
+    os.replace(partial, output)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Score a CSV or Parquet dataset offline with the serving model"
+    )
+    parser.add_argument("input", help="CSV or Parquet file, directory or glob with x1..x10")
+    parser.add_argument("output", help="Output file, .csv or .parquet")
+    parser.add_argument("--source", help="Model source, defaults to MODEL_SOURCE from the env")
+    parser.add_argument("--engine", choices=("numpy", "keras"), help="Inference engine")
+    parser.add_argument("--chunk-rows", type=int, default=100000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument(
+        "--progress-interval", type=float, default=5.0, help="Seconds between progress lines"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Discard an existing checkpoint and start over"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        from app.utils.features import FEATURE_NAMES
+        from app.utils.tabular import iter_chunks, resolve_paths
+
+        extension = os.path.splitext(args.output)[1].lower()
+        if extension not in OUTPUT_FORMATS:
+            raise ValueError(f"Output must be one of {', '.join(OUTPUT_FORMATS)}")
+
+        configure_environment(args)
+        version = resolve_model_version()
+        paths = resolve_paths(args.input)
+
+        # Finished chunks live in <output>.parts/ next to the checkpoint until the final merge
+        parts_dir = f"{args.output}.parts"
+        checkpoint_path = os.path.join(parts_dir, "checkpoint.json")
+        if args.restart:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        os.makedirs(parts_dir, exist_ok=True)
+        expected = {
+            "inputs": input_signature(paths),
+            "chunk_rows": args.chunk_rows,
+            "model_version": version,
+            "format": extension,
+        }
+        chunks_done, rows_done = load_checkpoint(checkpoint_path, expected)
+        if chunks_done:
+            print(f"Resuming after {chunks_done} chunks ({rows_done:,} rows)")
+
+        print(f"Scoring {len(paths)} files with model {version} on {args.workers} workers")
+
+        def remaining_chunks():
+            # Chunks before the checkpoint are read again but not scored
+            offset = 0
+            for index, chunk in enumerate(iter_chunks(paths, FEATURE_NAMES, args.chunk_rows)):
+                if index >= chunks_done:
+                    yield (index, offset), chunk
+                offset += len(chunk)
+
+        started = time.perf_counter()
+        last_report = started
+        rows_scored = 0
+        chunks = chunks_done
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as pool:
+            results = score_in_order(pool, remaining_chunks(), window=2 * args.workers)
+            for (index, offset), predictions, scored_version in results:
+                if scored_version != version:
+                    raise RuntimeError(
+                        f"Worker scored with model {scored_version}, expected {version}"
+                    )
+                rows = np.arange(offset, offset + len(predictions), dtype=np.int64)
+                write_part(part_path(parts_dir, index, extension), rows, predictions, extension)
+                chunks = index + 1
+                rows_done = offset + len(predictions)
+                rows_scored += len(predictions)
+                save_checkpoint(checkpoint_path, expected, chunks, rows_done)
+
+                now = time.perf_counter()
+                if now - last_report >= args.progress_interval:
+                    rate = rows_scored / (now - started)
+                    print(f"{rows_done:,} rows scored ({rate:,.0f} rows/s)")
+                    last_report = now
+
+        merge_parts(parts_dir, chunks, args.output, extension)
+        shutil.rmtree(parts_dir)
+
+        elapsed = time.perf_counter() - started
+        rate = rows_scored / elapsed if elapsed > 0 else 0.0
+        print(
+            f"✅ {rows_done:,} predictions written to {args.output} "
+            f"({rows_scored:,} scored in {elapsed:.1f}s, {rate:,.0f} rows/s)"
+        )
+        return True
+
+    except KeyboardInterrupt:
+        print(f"❌ Interrupted, rerun the same command to resume from {args.output}.parts")
+        return False
+
+    except Exception as e:
+        print(f"❌ Bulk scoring failed: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from app.services.numpy_engine import NumpyEngine, load_layers
+from export_weights import check_parity, export_layers
+from sklearn.preprocessing import StandardScaler
+
+N_FEATURES = 10
+
+
+def dense_batch_norm_dropout():
+    # The architecture train_model.py builds: Dense → BatchNormalization → Dropout blocks
+    return [
+        tf.keras.layers.Dense(16, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(8, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(1),
+    ]
+
+
+def batch_norm_after_linear_dense():
+    # Folds backwards into the preceding dense layer
+    return [
+        tf.keras.layers.Dense(16),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(1),
+    ]
+
+
+def batch_norm_on_input():
+    # Folds together with the scaler into the first dense layer
+    return [
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(8, activation="relu"),
+        tf.keras.layers.Dense(1),
+        tf.keras.layers.BatchNormalization(),
+    ]
+
+
+def build(layers, seed=0):
+    # Model with non-trivial BatchNormalization statistics, as after training
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([tf.keras.Input(shape=(N_FEATURES,)), *layers])
+    rng = np.random.default_rng(seed)
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.BatchNormalization):
+            width = layer.moving_mean.shape[0]
+            layer.set_weights(
+                [
+                    rng.uniform(0.5, 2.0, width),
+                    rng.normal(0, 0.5, width),
+                    rng.normal(0, 1.0, width),
+                    rng.uniform(0.1, 3.0, width),
+                ]
+            )
+    return model
+
+
+@pytest.fixture
+def scaler():
+    rng = np.random.default_rng(1)
+    return StandardScaler().fit(rng.normal(5.0, 3.0, size=(500, N_FEATURES)))
+
+
+def export(model, path):
+    spec, arrays = export_layers(model)
+    np.savez_compressed(path, spec=np.array(json.dumps(spec)), **arrays)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "layers", [dense_batch_norm_dropout, batch_norm_after_linear_dense, batch_norm_on_input]
+)
+def test_folded_engine_matches_keras(layers, scaler, tmp_path):
+    model = build(layers())
+    weights_path = export(model, tmp_path / "model_weights.npz")
+
+    assert check_parity(model, scaler, weights_path, tolerance=1e-4)
+
+    # Scaler and BatchNorm leave no layers of their own behind
+    engine = NumpyEngine.from_layers(load_layers(weights_path), scaler)
+    dense_count = sum(isinstance(layer, tf.keras.layers.Dense) for layer in model.layers)
+    assert len(engine.dense_layers) == dense_count
+
+
+def test_packed_weights_match_folded_engine(scaler, tmp_path):
+    model = build(dense_batch_norm_dropout())
+    engine = NumpyEngine.from_file(export(model, tmp_path / "model_weights.npz"), scaler)
+    engine.save_packed(str(tmp_path / "packed.npy"))
+    packed = NumpyEngine.from_packed(str(tmp_path / "packed.npy"))
+
+    features = np.random.default_rng(2).normal(5.0, 3.0, size=(100, N_FEATURES))
+    np.testing.assert_allclose(packed.predict(features), engine.predict(features), rtol=1e-12)
@@ -1,134 +1,585 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
 import pickle
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import matplotlib.pyplot as plt
 import numpy as np
-import tensorflow as tf
 from sklearn.datasets import load_diabetes
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import KFold, train_test_split
 from sklearn.preprocessing import StandardScaler
 
-# === Load data ===
-data = load_diabetes()
-X = data.data
-y = data.target
+OUTPUT_DIR = "./trained_model"
+MODEL_PATH = f"{OUTPUT_DIR}/tf_model.h5"
+SCALER_PATH = f"{OUTPUT_DIR}/scaler.pkl"
+WEIGHTS_PATH = f"{OUTPUT_DIR}/model_weights.npz"
+LEADERBOARD_PATH = f"{OUTPUT_DIR}/leaderboard.csv"
 
-print(f"Dataset size: {len(X)} samples with {X.shape[1]} features")
+# === Hyperparameter search space ===
+SEARCH_SPACE = {
+    "widths": [(32, 16), (64, 32), (128, 64)],
+    "dropout": [0.1, 0.2, 0.3],
+    "l2": [0.0001, 0.001, 0.01],
+    "learning_rate": [0.0003, 0.001, 0.003],
+}
 
-# === Data scaling ===
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# The configuration that was hard-coded before the search existed
+DEFAULT_PARAMS = {"widths": (64, 32), "dropout": 0.3, "l2": 0.001, "learning_rate": 0.001}
 
-# === Train/test split with stratification ===
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+# Row split of streamed datasets: test, then validation (20% of the rest), then training
+TEST_FRACTION = 0.2
+VALIDATION_FRACTION = 0.16
+SPLITS = ("train", "validation", "test")
+
+# Best cross-validated MAE so far, shared with the worker processes for pruning
+_best_score = None
+
+
+def load_data():
+    """
+    Loads the diabetes dataset
+    Returns features, target and feature names
+    """
+    data = load_diabetes()
+    print(f"Dataset size: {len(data.data)} samples with {data.data.shape[1]} features")
+    return data.data, data.target, data.feature_names
+
+
+def split_of_rows(n_rows, chunk_index, seed):
+    """
+    Deterministically assigns each row of a chunk to train, validation or test
+    The same file, chunk size and seed always give the same split on every pass
+    """
+    draws = np.random.default_rng([seed, chunk_index]).random(n_rows)
+    split = np.zeros(n_rows, dtype=np.int8)
+    split[draws < TEST_FRACTION + VALIDATION_FRACTION] = SPLITS.index("validation")
+    split[draws < TEST_FRACTION] = SPLITS.index("test")
+    return split
+
+
+def stream_split(paths, args, split):
+    """
+    Yields (features, target) chunks of one split, skipping rows with missing values
+    Only one chunk is held in memory at a time
+    """
+    from app.utils.tabular import iter_chunks
+
+    columns = args.features + [args.target]
+    for chunk_index, chunk in enumerate(iter_chunks(paths, columns, args.chunk_rows)):
+        keep = (split_of_rows(len(chunk), chunk_index, args.seed) == SPLITS.index(split)) & (
+            np.isfinite(chunk).all(axis=1)
+        )
+        yield chunk[keep, :-1], chunk[keep, -1]
+
+
+def fit_streaming_scaler(paths, args):
+    """
+    Fits the scaler incrementally over the training rows
+    Returns the scaler and the number of training rows
+    """
+    scaler = StandardScaler()
+    rows = 0
+    for X_chunk, _ in stream_split(paths, args, "train"):
+        if len(X_chunk):
+            scaler.partial_fit(X_chunk)
+            rows += len(X_chunk)
+    if rows == 0:
+        raise ValueError("No complete training rows found in the dataset")
+    return scaler, rows
+
+
+def load_sample(paths, args, split, max_rows, scaler=None):
+    """
+    Collects up to max_rows rows of one split into memory, e.g. for search or plots
+    """
+    X_parts, y_parts, rows = [], [], 0
+    for X_chunk, y_chunk in stream_split(paths, args, split):
+        X_parts.append(X_chunk[: max_rows - rows])
+        y_parts.append(y_chunk[: max_rows - rows])
+        rows += len(X_parts[-1])
+        if rows >= max_rows:
+            break
+    X = np.concatenate(X_parts) if X_parts else np.empty((0, len(args.features)))
+    y = np.concatenate(y_parts) if y_parts else np.empty(0)
+    return (scaler.transform(X) if scaler is not None and len(X) else X), y
+
+
+def make_dataset(paths, args, split, scaler, shuffle=False):
+    """
+    Batched, prefetching tf.data pipeline over one split
+    Memory is bounded by the chunk size and the shuffle buffer, not by the dataset size
+    """
+    import tensorflow as tf
+
+    def generate():
+        rng = np.random.default_rng(args.seed)
+        for X_chunk, y_chunk in stream_split(paths, args, split):
+            if not len(X_chunk):
+                continue
+            order = rng.permutation(len(X_chunk)) if shuffle else slice(None)
+            yield (
+                scaler.transform(X_chunk)[order].astype(np.float32),
+                y_chunk[order].astype(np.float32),
+            )
+
+    dataset = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None, len(args.features)), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32),
+        ),
+    ).unbatch()
+    if shuffle:
+        dataset = dataset.shuffle(args.shuffle_buffer, seed=args.seed)
+    return dataset.batch(args.batch_size).prefetch(tf.data.AUTOTUNE)
 
 
 # === Improved Keras model with regularization ===
-def build_model(learning_rate=0.001):
-    model = tf.keras.Sequential(
-        [
-            tf.keras.layers.Dense(
-                64,
-                input_shape=(X.shape[1],),
-                activation='relu',
-                kernel_regularizer=tf.keras.regularizers.l2(0.001),
-            ),
-            tf.keras.layers.BatchNormalization(),
-            tf.keras.layers.Dropout(0.3),
+def build_model(input_dim, widths=(64, 32), dropout=0.3, l2=0.001, learning_rate=0.001):
+    """
+    Builds Dense → BatchNormalization → Dropout blocks followed by a regression output
+    Only these layer types are supported by export_weights.py and the NumPy engine
+    """
+    import tensorflow as tf
+
+    layers = [tf.keras.Input(shape=(input_dim,))]
+    for width in widths:
+        layers += [
             tf.keras.layers.Dense(
-                32, activation='relu', kernel_regularizer=tf.keras.regularizers.l2(0.001)
+                width, activation='relu', kernel_regularizer=tf.keras.regularizers.l2(l2)
             ),
             tf.keras.layers.BatchNormalization(),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(1),  # Regression output
+            tf.keras.layers.Dropout(dropout),
         ]
-    )
+    layers.append(tf.keras.layers.Dense(1))  # Regression output
 
+    model = tf.keras.Sequential(layers)
     optimizer = tf.keras.optimizers.Adam(learning_rate=learning_rate)
     model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
     return model
 
 
-# === Early stopping callback ===
-early_stopping = tf.keras.callbacks.EarlyStopping(
-    monitor='val_loss', patience=30, restore_best_weights=True, verbose=1
-)
-
-# === Reduce learning rate on plateau ===
-reduce_lr = tf.keras.callbacks.ReduceLROnPlateau(
-    monitor='val_loss', factor=0.5, patience=10, min_lr=0.00001, verbose=1
-)
-
-# === Model training ===
-model = build_model()
-history = model.fit(
-    X_train,
-    y_train,
-    epochs=300,
-    batch_size=16,  # Smaller batch size for better generalization
-    validation_split=0.2,  # Larger validation split
-    callbacks=[early_stopping, reduce_lr],
-    verbose=1,
-)
-
-# === Evaluate model on test set ===
-test_loss, test_mae = model.evaluate(X_test, y_test, verbose=0)
-print(f"Test MAE: {test_mae:.2f}")
-
-# === Save model and scaler ===
-model.save("./trained_model/tf_model.h5")
-with open("./trained_model/scaler.pkl", "wb") as f:
-    pickle.dump(scaler, f)
-
-# === Plot training history ===
-plt.figure(figsize=(12, 5))
-
-# Training metrics plot
-plt.subplot(1, 2, 1)
-plt.plot(history.history['mae'], label='Training MAE')
-plt.plot(history.history['val_mae'], label='Validation MAE')
-plt.xlabel('Epoch')
-plt.ylabel('MAE')
-plt.title('Training & Validation MAE')
-plt.legend()
-plt.grid(True)
-
-# Learning rate plot if available
-if 'lr' in history.history:
-    plt.subplot(1, 2, 2)
-    plt.semilogy(history.history['lr'], label='Learning Rate')
+def fit_model(model, X_train, y_train, epochs, validation_data=None, verbose=0, batch_size=16):
+    """
+    Trains with early stopping and learning rate reduction on plateau
+    X_train may also be a batched tf.data.Dataset, with y_train set to None
+    Returns the Keras training history
+    """
+    import tensorflow as tf
+
+    callbacks = [
+        # === Early stopping callback ===
+        tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss', patience=30, restore_best_weights=True, verbose=verbose
+        ),
+        # === Reduce learning rate on plateau ===
+        tf.keras.callbacks.ReduceLROnPlateau(
+            monitor='val_loss', factor=0.5, patience=10, min_lr=0.00001, verbose=verbose
+        ),
+    ]
+    if y_train is None:
+        # Streaming input arrives already batched, with its own validation split
+        return model.fit(
+            X_train,
+            epochs=epochs,
+            validation_data=validation_data,
+            callbacks=callbacks,
+            verbose=verbose,
+        )
+    return model.fit(
+        X_train,
+        y_train,
+        epochs=epochs,
+        batch_size=batch_size,  # Smaller batch size for better generalization
+        validation_data=validation_data,
+        validation_split=0.0 if validation_data is not None else 0.2,
+        callbacks=callbacks,
+        verbose=verbose,
+    )
+
+
+def _init_worker(best_score, seed):
+    """
+    Runs once per worker process: one TensorFlow thread per process, since the
+    parallelism comes from the process pool, and access to the shared best score
+    """
+    global _best_score
+    _best_score = best_score
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    tf.keras.utils.set_random_seed(seed)
+
+
+def evaluate_trial(trial_id, params, X, y, folds, epochs, prune_margin, seed):
+    """
+    K-fold cross-validation of one hyperparameter set
+    Remaining folds are skipped once the running mean MAE is clearly worse than the best trial
+    """
+    started = time.perf_counter()
+    scores = []
+    epochs_run = []
+    pruned = False
+
+    for fold, (train_idx, val_idx) in enumerate(
+        KFold(n_splits=folds, shuffle=True, random_state=seed).split(X)
+    ):
+        # Scaler is fitted on the training folds only, so validation stays unseen
+        scaler = StandardScaler().fit(X[train_idx])
+        model = build_model(X.shape[1], **params)
+        history = fit_model(
+            model,
+            scaler.transform(X[train_idx]),
+            y[train_idx],
+            epochs,
+            validation_data=(scaler.transform(X[val_idx]), y[val_idx]),
+        )
+        _, mae = model.evaluate(scaler.transform(X[val_idx]), y[val_idx], verbose=0)
+        scores.append(mae)
+        epochs_run.append(len(history.history['loss']))
+
+        best = _best_score.value if _best_score is not None else float("inf")
+        if fold + 1 < folds and np.mean(scores) > best * (1 + prune_margin):
+            pruned = True
+            break
+
+    mean_mae = float(np.mean(scores))
+    if not pruned and _best_score is not None:
+        with _best_score.get_lock():
+            _best_score.value = min(_best_score.value, mean_mae)
+
+    return {
+        "trial": trial_id,
+        "params": params,
+        "mean_mae": mean_mae,
+        "std_mae": float(np.std(scores)),
+        "folds": len(scores),
+        "pruned": pruned,
+        "epochs": float(np.mean(epochs_run)),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def sample_trials(n_trials, seed):
+    """
+    Returns n_trials distinct parameter sets from the search space, the default first
+    """
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    rest = [params for params in grid if params != DEFAULT_PARAMS]
+    random.Random(seed).shuffle(rest)
+    return [DEFAULT_PARAMS] + rest[: max(0, n_trials - 1)]
+
+
+def run_search(X, y, args):
+    """
+    Evaluates the sampled trials in parallel across a process pool
+    Returns the leaderboard sorted by mean cross-validated MAE (pruned trials last)
+    """
+    trials = sample_trials(args.trials, args.seed)
+    # TensorFlow is not fork-safe, workers start from a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    best_score = context.Value("d", float("inf"))
+    print(f"Searching {len(trials)} trials × {args.folds} folds on {args.workers} workers")
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(best_score, args.seed),
+    ) as pool:
+        futures = [
+            pool.submit(
+                evaluate_trial,
+                trial_id,
+                params,
+                X,
+                y,
+                args.folds,
+                args.epochs,
+                args.prune_margin,
+                args.seed,
+            )
+            for trial_id, params in enumerate(trials)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "pruned" if result["pruned"] else "done"
+            print(
+                f"Trial {result['trial']:3d} {status:6s} MAE {result['mean_mae']:7.2f} "
+                f"± {result['std_mae']:5.2f} ({result['folds']} folds, "
+                f"{result['seconds']:.0f}s) {json.dumps(result['params'])}"
+            )
+
+    return sorted(results, key=lambda result: (result["pruned"], result["mean_mae"]))
+
+
+def write_leaderboard(results, path):
+    """
+    Writes the search results as CSV, best trial first
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["rank", "trial", "mean_mae", "std_mae", "folds", "pruned", "epochs", "seconds"]
+            + list(SEARCH_SPACE)
+        )
+        for rank, result in enumerate(results, start=1):
+            writer.writerow(
+                [
+                    rank,
+                    result["trial"],
+                    round(result["mean_mae"], 4),
+                    round(result["std_mae"], 4),
+                    result["folds"],
+                    result["pruned"],
+                    round(result["epochs"], 1),
+                    round(result["seconds"], 1),
+                ]
+                + [json.dumps(result["params"][name]) for name in SEARCH_SPACE]
+            )
+    print(f"Leaderboard written to {path}")
+
+
+def save_artifacts(model, scaler):
+    """
+    Saves model and scaler in the layout upload_to_s3.py expects
+    """
+    model.save(MODEL_PATH)
+    with open(SCALER_PATH, "wb") as f:
+        pickle.dump(scaler, f)
+
+    # Weights exported for the previous model would be uploaded next to the new one
+    if os.path.exists(WEIGHTS_PATH):
+        os.remove(WEIGHTS_PATH)
+        print(f"Removed stale {WEIGHTS_PATH}, run export_weights.py to regenerate it")
+
+
+def plot_results(model, history, X_test, y_test, feature_names):
+    """
+    Saves training curves, feature importance and the prediction scatter plot
+    """
+    # === Plot training history ===
+    plt.figure(figsize=(12, 5))
+
+    # Training metrics plot
+    plt.subplot(1, 2, 1)
+    plt.plot(history.history['mae'], label='Training MAE')
+    plt.plot(history.history['val_mae'], label='Validation MAE')
     plt.xlabel('Epoch')
-    plt.ylabel('Learning Rate')
-    plt.title('Learning Rate Schedule')
-    plt.grid(True)
+    plt.ylabel('MAE')
+    plt.title('Training & Validation MAE')
     plt.legend()
+    plt.grid(True)
+
+    # Learning rate plot if available
+    if 'lr' in history.history:
+        plt.subplot(1, 2, 2)
+        plt.semilogy(history.history['lr'], label='Learning Rate')
+        plt.xlabel('Epoch')
+        plt.ylabel('Learning Rate')
+        plt.title('Learning Rate Schedule')
+        plt.grid(True)
+        plt.legend()
+
+    plt.tight_layout()
+    plt.savefig(f"{OUTPUT_DIR}/training_plot.png")
+
+    # === Feature importance analysis ===
+    # Get weights from the first layer
+    first_layer_weights = np.abs(model.layers[0].get_weights()[0])
+    feature_importance = np.mean(first_layer_weights, axis=1)
+
+    # Plot feature importance
+    plt.figure(figsize=(10, 6))
+    plt.barh(feature_names, feature_importance)
+    plt.xlabel('Average Absolute Weight')
+    plt.title('Feature Importance')
+    plt.tight_layout()
+    plt.savefig(f"{OUTPUT_DIR}/feature_importance.png")
+
+    # === Make predictions on test data and visualize ===
+    y_pred = model.predict(X_test, verbose=0).flatten()
+
+    plt.figure(figsize=(8, 8))
+    plt.scatter(y_test, y_pred)
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'k--', lw=2)
+    plt.xlabel('Actual Values')
+    plt.ylabel('Predicted Values')
+    plt.title('Prediction Scatter Plot')
+    plt.grid(True)
+    plt.savefig(f"{OUTPUT_DIR}/prediction_scatter.png")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the diabetes progression model")
+    parser.add_argument(
+        "--search", action="store_true", help="Run a cross-validated hyperparameter search first"
+    )
+    parser.add_argument("--trials", type=int, default=12, help="Parameter sets to evaluate")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds per trial")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes"
+    )
+    parser.add_argument("--epochs", type=int, default=300, help="Maximum epochs per fit")
+    parser.add_argument(
+        "--prune-margin",
+        type=float,
+        default=0.15,
+        help="Stop a trial once its running MAE is this much worse than the best trial",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=16)
+
+    # Out-of-core training on CSV or Parquet files
+    parser.add_argument(
+        "--data",
+        help="CSV or Parquet file, directory, glob or export manifest; "
+        "default is the built-in dataset",
+    )
+    parser.add_argument(
+        "--since", help="With an export manifest, only read date partitions from this YYYY-MM-DD"
+    )
+    parser.add_argument(
+        "--features",
+        type=lambda value: value.split(","),
+        default=[f"x{i}" for i in range(1, 11)],
+        help="Comma-separated feature columns, in model input order",
+    )
+    parser.add_argument("--target", default="target", help="Target column")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="Rows read per chunk")
+    parser.add_argument(
+        "--shuffle-buffer", type=int, default=10000, help="Rows in the training shuffle buffer"
+    )
+    parser.add_argument(
+        "--search-rows", type=int, default=100000, help="Training rows sampled for --search"
+    )
+    parser.add_argument(
+        "--plot-rows", type=int, default=5000, help="Test rows sampled for the scatter plot"
+    )
+    return parser.parse_args()
+
+
+def search_best_params(X, y, args):
+    """
+    Runs the hyperparameter search when requested
+    Returns the parameters to train the final model with
+    """
+    if not args.search:
+        return DEFAULT_PARAMS
+    results = run_search(X, y, args)
+    write_leaderboard(results, LEADERBOARD_PATH)
+    print(f"Best parameters: {json.dumps(results[0]['params'])} (MAE {results[0]['mean_mae']:.2f})")
+    return results[0]["params"]
+
+
+def train_in_memory(args):
+    """
+    Trains on the built-in diabetes dataset held in memory
+    Returns the model, scaler, history, scaled test features, test target and feature names
+    """
+    import tensorflow as tf
+    from app.services.drift_monitor import reference_histograms
+
+    X, y, feature_names = load_data()
+
+    # === Train/test split, the test set is never seen by the search ===
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_FRACTION, random_state=args.seed
+    )
+    params = search_best_params(X_train, y_train, args)
+    tf.keras.utils.set_random_seed(args.seed)
+
+    # === Data scaling, with the training histograms the API's drift monitor compares with ===
+    scaler = StandardScaler().fit(X_train)
+    scaler.drift_reference_ = reference_histograms(X_train)
+    X_train_scaled = scaler.transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    # === Model training ===
+    model = build_model(X.shape[1], **params)
+    history = fit_model(
+        model, X_train_scaled, y_train, args.epochs, verbose=1, batch_size=args.batch_size
+    )
+
+    # === Evaluate model on test set ===
+    test_loss, test_mae = model.evaluate(X_test_scaled, y_test, verbose=0)
+    print(f"Test MAE: {test_mae:.2f}")
+    return model, scaler, history, X_test_scaled, y_test, feature_names
+
+
+def train_streaming(args):
+    """
+    Trains on CSV or Parquet files that do not fit in memory
+    Returns the model, scaler, history, a scaled test sample, its target and feature names
+    """
+    import tensorflow as tf
+    from app.services.drift_monitor import reference_histograms
+    from app.utils.tabular import resolve_paths
+
+    paths = resolve_paths(args.data, args.since)
+    print(f"Streaming {len(paths)} files in chunks of {args.chunk_rows} rows")
+
+    # === Data scaling, one pass with partial_fit ===
+    scaler, train_rows = fit_streaming_scaler(paths, args)
+    print(f"Scaler fitted on {train_rows} training rows")
+
+    X_search, y_search = load_sample(paths, args, "train", args.search_rows)
+    scaler.drift_reference_ = reference_histograms(X_search)
+    params = search_best_params(X_search, y_search, args)
+    del X_search, y_search
+    tf.keras.utils.set_random_seed(args.seed)
+
+    # === Model training, the files are re-read on every epoch ===
+    model = build_model(len(args.features), **params)
+    history = fit_model(
+        model,
+        make_dataset(paths, args, "train", scaler, shuffle=True),
+        None,
+        args.epochs,
+        validation_data=make_dataset(paths, args, "validation", scaler),
+        verbose=1,
+    )
+
+    # === Evaluate model on test set ===
+    test_loss, test_mae = model.evaluate(make_dataset(paths, args, "test", scaler), verbose=0)
+    print(f"Test MAE: {test_mae:.2f}")
+
+    X_test, y_test = load_sample(paths, args, "test", args.plot_rows, scaler)
+    return model, scaler, history, X_test, y_test, args.features
+
+
+def main():
+    args = parse_args()
+    try:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        if args.data:
+            model, scaler, history, X_test, y_test, feature_names = train_streaming(args)
+        else:
+            model, scaler, history, X_test, y_test, feature_names = train_in_memory(args)
+
+        # === Save model and scaler ===
+        save_artifacts(model, scaler)
+        plot_results(model, history, X_test, y_test, feature_names)
+
+        print("Model training and evaluation complete!")
+        return True
+
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return False
+
 
-plt.tight_layout()
-plt.savefig("./trained_model/training_plot.png")
-
-# === 11. Feature importance analysis ===
-# Get weights from the first layer
-first_layer_weights = np.abs(model.layers[0].get_weights()[0])
-feature_importance = np.mean(first_layer_weights, axis=1)
-feature_names = data.feature_names
-
-# Plot feature importance
-plt.figure(figsize=(10, 6))
-plt.barh(feature_names, feature_importance)
-plt.xlabel('Average Absolute Weight')
-plt.title('Feature Importance')
-plt.tight_layout()
-plt.savefig("./trained_model/feature_importance.png")
-
-# === 12. Make predictions on test data and visualize ===
-y_pred = model.predict(X_test).flatten()
-
-plt.figure(figsize=(8, 8))
-plt.scatter(y_test, y_pred)
-plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'k--', lw=2)
-plt.xlabel('Actual Values')
-plt.ylabel('Predicted Values')
-plt.title('Prediction Scatter Plot')
-plt.grid(True)
-plt.savefig("./trained_model/prediction_scatter.png")
-
-print("Model training and evaluation complete!")
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
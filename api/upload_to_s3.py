@@ -53,6 +53,13 @@ def main():
             {"local_path": "./trained_model/scaler.pkl", "key": f"{prefix}/scaler.pkl"},
         ]
 
+        # NumPy engine weights are optional, produced by export_weights.py
+        weights_path = "./trained_model/model_weights.npz"
+        if os.path.exists(weights_path):
+            files_to_upload.append(
+                {"local_path": weights_path, "key": f"{prefix}/model_weights.npz"}
+            )
+
         # Upload files
         success = True
         for file_info in files_to_upload: